@@ -0,0 +1,44 @@
+"""Add materialized path to notes"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("notes", sa.Column("path", sa.Text(), nullable=True))
+
+    op.execute(
+        """
+        WITH RECURSIVE tree AS (
+            SELECT id, '/' || id::text || '/' AS path
+            FROM notes
+            WHERE parent_id IS NULL
+            UNION ALL
+            SELECT child.id, tree.path || child.id::text || '/'
+            FROM notes AS child
+            JOIN tree ON child.parent_id = tree.id
+        )
+        UPDATE notes SET path = tree.path FROM tree WHERE notes.id = tree.id
+        """
+    )
+    # Rows caught in a parent cycle are unreachable from any root; detach them.
+    op.execute(
+        "UPDATE notes SET parent_id = NULL, path = '/' || id::text || '/' WHERE path IS NULL"
+    )
+
+    op.alter_column("notes", "path", nullable=False)
+    op.create_index(
+        "ix_notes_path", "notes", ["path"], postgresql_ops={"path": "text_pattern_ops"}
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_notes_path", table_name="notes")
+    op.drop_column("notes", "path")
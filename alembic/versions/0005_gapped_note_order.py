@@ -0,0 +1,45 @@
+"""Space note order_index values apart"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+ORDER_GAP = 1 << 16
+
+
+def upgrade() -> None:
+    op.alter_column("notes", "order_index", type_=sa.BigInteger(), existing_nullable=False)
+    op.execute(
+        f"""
+        UPDATE notes SET order_index = ranked.rank * {ORDER_GAP}
+        FROM (
+            SELECT id, row_number() OVER (
+                PARTITION BY parent_id ORDER BY order_index, created_at, id
+            ) AS rank
+            FROM notes
+        ) AS ranked
+        WHERE notes.id = ranked.id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        """
+        UPDATE notes SET order_index = ranked.rank - 1
+        FROM (
+            SELECT id, row_number() OVER (
+                PARTITION BY parent_id ORDER BY order_index, created_at, id
+            ) AS rank
+            FROM notes
+        ) AS ranked
+        WHERE notes.id = ranked.id
+        """
+    )
+    op.alter_column("notes", "order_index", type_=sa.Integer(), existing_nullable=False)
@@ -0,0 +1,102 @@
+"""Add full-text search vector and trigram title index to notes"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    op.add_column("notes", sa.Column("search_vector", postgresql.TSVECTOR(), nullable=True))
+
+    # Title (weight A) plus the markdown of the latest content version (weight B).
+    op.execute(
+        """
+        CREATE FUNCTION notes_search_document(note_title text, note_id uuid)
+        RETURNS tsvector LANGUAGE sql STABLE AS $$
+            SELECT setweight(to_tsvector('english', coalesce(note_title, '')), 'A')
+                || setweight(
+                    to_tsvector(
+                        'english',
+                        coalesce(
+                            (
+                                SELECT markdown FROM note_contents
+                                WHERE note_contents.note_id = notes_search_document.note_id
+                                ORDER BY version DESC
+                                LIMIT 1
+                            ),
+                            ''
+                        )
+                    ),
+                    'B'
+                )
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE FUNCTION notes_search_vector_refresh() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            NEW.search_vector := notes_search_document(NEW.title, NEW.id);
+            RETURN NEW;
+        END
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER notes_search_vector_refresh
+        BEFORE INSERT OR UPDATE OF title ON notes
+        FOR EACH ROW EXECUTE FUNCTION notes_search_vector_refresh()
+        """
+    )
+    op.execute(
+        """
+        CREATE FUNCTION note_contents_search_vector_refresh() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            UPDATE notes SET search_vector = notes_search_document(notes.title, notes.id)
+            WHERE notes.id = NEW.note_id;
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER note_contents_search_vector_refresh
+        AFTER INSERT OR UPDATE OF markdown ON note_contents
+        FOR EACH ROW EXECUTE FUNCTION note_contents_search_vector_refresh()
+        """
+    )
+
+    op.execute("UPDATE notes SET search_vector = notes_search_document(title, id)")
+
+    op.create_index(
+        "ix_notes_search_vector", "notes", ["search_vector"], postgresql_using="gin"
+    )
+    op.create_index(
+        "ix_notes_title_trgm",
+        "notes",
+        ["title"],
+        postgresql_using="gin",
+        postgresql_ops={"title": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_notes_title_trgm", table_name="notes")
+    op.drop_index("ix_notes_search_vector", table_name="notes")
+    op.execute("DROP TRIGGER note_contents_search_vector_refresh ON note_contents")
+    op.execute("DROP FUNCTION note_contents_search_vector_refresh()")
+    op.execute("DROP TRIGGER notes_search_vector_refresh ON notes")
+    op.execute("DROP FUNCTION notes_search_vector_refresh()")
+    op.execute("DROP FUNCTION notes_search_document(text, uuid)")
+    op.drop_column("notes", "search_vector")
@@ -0,0 +1,36 @@
+"""Add secondary indexes for note filter and sort paths"""
+
+from __future__ import annotations
+
+from alembic import op
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+# (name, table, columns); each index leads with the filter column and then
+# follows the (order_index, created_at, id) keyset used by the note queries.
+INDEXES = [
+    ("ix_notes_order", "notes", ["order_index", "created_at", "id"]),
+    ("ix_notes_user_order", "notes", ["user_id", "order_index", "created_at", "id"]),
+    ("ix_notes_parent_order", "notes", ["parent_id", "order_index", "created_at", "id"]),
+    ("ix_notes_type_order", "notes", ["type", "order_index", "created_at", "id"]),
+    ("ix_note_tags_tag_note", "note_tags", ["tag_id", "note_id"]),
+    ("ix_assets_note_id", "assets", ["note_id"]),
+]
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name, table, columns, postgresql_concurrently=True, if_not_exists=True
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,39 @@
+"""Store note content versions as deltas"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "note_contents",
+        sa.Column("is_delta", sa.Boolean(), nullable=False, server_default=sa.text("false")),
+    )
+    op.add_column("note_contents", sa.Column("tiptap_patch", postgresql.JSONB(), nullable=True))
+    op.add_column("note_contents", sa.Column("markdown_patch", postgresql.JSONB(), nullable=True))
+
+
+def downgrade() -> None:
+    # Delta rows cannot be expanded in SQL; refuse rather than lose history.
+    op.execute(
+        """
+        DO $$
+        BEGIN
+            IF EXISTS (SELECT 1 FROM note_contents WHERE is_delta) THEN
+                RAISE EXCEPTION 'note_contents holds delta versions; expand them before downgrading';
+            END IF;
+        END
+        $$
+        """
+    )
+    op.drop_column("note_contents", "markdown_patch")
+    op.drop_column("note_contents", "tiptap_patch")
+    op.drop_column("note_contents", "is_delta")
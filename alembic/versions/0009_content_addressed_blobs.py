@@ -0,0 +1,71 @@
+"""Share asset objects by content hash with reference counting"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "blobs",
+        sa.Column("sha256", sa.String(length=64), primary_key=True),
+        sa.Column("s3_key", sa.String(length=500), nullable=False),
+        sa.Column("size", sa.BigInteger(), nullable=False),
+        sa.Column("mime", sa.String(length=100), nullable=True),
+        sa.Column("ref_count", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index(
+        "ix_blobs_unreferenced", "blobs", ["sha256"], postgresql_where=sa.text("ref_count = 0")
+    )
+
+    op.alter_column("assets", "size", type_=sa.BigInteger(), existing_nullable=True)
+    op.add_column(
+        "assets",
+        sa.Column("blob_sha256", sa.String(length=64), sa.ForeignKey("blobs.sha256"), nullable=True),
+    )
+    op.create_index("ix_assets_blob_sha256", "assets", ["blob_sha256"])
+
+    # Counted in the database so ON DELETE CASCADE from notes and users is covered too.
+    op.execute(
+        """
+        CREATE FUNCTION assets_blob_ref_count() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP <> 'INSERT' THEN
+                IF OLD.blob_sha256 IS NOT NULL THEN
+                    UPDATE blobs SET ref_count = ref_count - 1 WHERE sha256 = OLD.blob_sha256;
+                END IF;
+            END IF;
+            IF TG_OP <> 'DELETE' THEN
+                IF NEW.blob_sha256 IS NOT NULL THEN
+                    UPDATE blobs SET ref_count = ref_count + 1 WHERE sha256 = NEW.blob_sha256;
+                END IF;
+            END IF;
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER assets_blob_ref_count
+        AFTER INSERT OR DELETE OR UPDATE OF blob_sha256 ON assets
+        FOR EACH ROW EXECUTE FUNCTION assets_blob_ref_count()
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS assets_blob_ref_count ON assets")
+    op.execute("DROP FUNCTION IF EXISTS assets_blob_ref_count()")
+    op.drop_index("ix_assets_blob_sha256", table_name="assets")
+    op.drop_column("assets", "blob_sha256")
+    op.alter_column("assets", "size", type_=sa.Integer(), existing_nullable=True)
+    op.drop_index("ix_blobs_unreferenced", table_name="blobs")
+    op.drop_table("blobs")
@@ -0,0 +1,57 @@
+"""Make user-less tags unique by name and slug"""
+
+from __future__ import annotations
+
+from alembic import op
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+
+def _merge_shared_tags(column: str) -> None:
+    """Fold duplicate user-less tags into the oldest one, keeping their note links."""
+
+    op.execute(
+        f"""
+        CREATE TEMPORARY TABLE tag_merges AS
+        SELECT id, keep_id FROM (
+            SELECT id, first_value(id) OVER (PARTITION BY {column} ORDER BY created_at, id) AS keep_id
+            FROM tags
+            WHERE user_id IS NULL
+        ) ranked
+        WHERE id <> keep_id
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO note_tags (note_id, tag_id)
+        SELECT note_tags.note_id, tag_merges.keep_id
+        FROM note_tags JOIN tag_merges ON tag_merges.id = note_tags.tag_id
+        ON CONFLICT DO NOTHING
+        """
+    )
+    op.execute("DELETE FROM tags USING tag_merges WHERE tags.id = tag_merges.id")
+    op.execute("DROP TABLE tag_merges")
+
+
+def upgrade() -> None:
+    _merge_shared_tags("slug")
+    _merge_shared_tags("name")
+
+    op.drop_constraint("uq_user_tag_slug", "tags", type_="unique")
+    op.drop_constraint("uq_user_tag_name", "tags", type_="unique")
+    op.create_unique_constraint(
+        "uq_user_tag_name", "tags", ["user_id", "name"], postgresql_nulls_not_distinct=True
+    )
+    op.create_unique_constraint(
+        "uq_user_tag_slug", "tags", ["user_id", "slug"], postgresql_nulls_not_distinct=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("uq_user_tag_slug", "tags", type_="unique")
+    op.drop_constraint("uq_user_tag_name", "tags", type_="unique")
+    op.create_unique_constraint("uq_user_tag_name", "tags", ["user_id", "name"])
+    op.create_unique_constraint("uq_user_tag_slug", "tags", ["user_id", "slug"])
@@ -0,0 +1,75 @@
+"""Maintain a per-tag note count"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0011"
+down_revision = "0010"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "tags",
+        sa.Column("note_count", sa.Integer(), nullable=False, server_default=sa.text("0")),
+    )
+
+    # Statement-level triggers apply one grouped UPDATE per statement, so a
+    # multi-row insert of note_tags touches each tag once.
+    op.execute(
+        """
+        CREATE FUNCTION note_tags_count_added() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            UPDATE tags SET note_count = tags.note_count + added.n
+            FROM (SELECT tag_id, count(*) AS n FROM added_rows GROUP BY tag_id) added
+            WHERE tags.id = added.tag_id;
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE FUNCTION note_tags_count_removed() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            UPDATE tags SET note_count = tags.note_count - removed.n
+            FROM (SELECT tag_id, count(*) AS n FROM removed_rows GROUP BY tag_id) removed
+            WHERE tags.id = removed.tag_id;
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER note_tags_count_added
+        AFTER INSERT ON note_tags REFERENCING NEW TABLE AS added_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION note_tags_count_added()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER note_tags_count_removed
+        AFTER DELETE ON note_tags REFERENCING OLD TABLE AS removed_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION note_tags_count_removed()
+        """
+    )
+
+    op.execute(
+        """
+        UPDATE tags SET note_count = counts.n
+        FROM (SELECT tag_id, count(*) AS n FROM note_tags GROUP BY tag_id) counts
+        WHERE tags.id = counts.tag_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS note_tags_count_removed ON note_tags")
+    op.execute("DROP TRIGGER IF EXISTS note_tags_count_added ON note_tags")
+    op.execute("DROP FUNCTION IF EXISTS note_tags_count_removed()")
+    op.execute("DROP FUNCTION IF EXISTS note_tags_count_added()")
+    op.drop_column("tags", "note_count")
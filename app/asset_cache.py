@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import logging
+import os
+import tempfile
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import BinaryIO, Iterable
+
+from anyio import to_thread
+
+from .config import get_settings
+from .metrics import MetricFamily, register_collector
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+PARTIAL_SUFFIX = ".part"
+
+# Bytes sent to clients by source; counted even when the cache is disabled.
+bytes_served = {"cache": 0, "storage": 0}
+
+
+class AssetCache:
+    """Size-bounded on-disk cache of whole asset objects with LRU eviction.
+
+    Entries are immutable files named after the asset version, so a hit can be
+    served straight from disk. The recency index lives in memory and is rebuilt
+    from file modification times on startup. The async methods run their file
+    system calls in worker threads; the index itself is only touched on the loop.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int, max_object_bytes: int) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_object_bytes = min(max_object_bytes, max_bytes)
+        self._entries: OrderedDict[str, int] = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._load()
+
+    def _load(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        files = []
+        for path in self.directory.iterdir():
+            if path.name.endswith(PARTIAL_SUFFIX):
+                path.unlink(missing_ok=True)
+                continue
+            stat = path.stat()
+            files.append((stat.st_mtime, path.name, stat.st_size))
+        for _, name, size in sorted(files):
+            self._entries[name] = size
+            self.total_bytes += size
+        self._evict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def admits(self, size: int | None) -> bool:
+        return size is not None and 0 < size <= self.max_object_bytes
+
+    async def lookup(self, name: str) -> tuple[Path, os.stat_result] | None:
+        """Return the cached file for ``name`` and mark it most recently used."""
+
+        path = self.directory / name
+        stat = await to_thread.run_sync(_touch, path)
+        if stat is None:
+            self._forget(name)
+            self.misses += 1
+            return None
+
+        if name not in self._entries:
+            # Written by another worker sharing the directory.
+            self.total_bytes += stat.st_size
+        self._entries[name] = stat.st_size
+        self._entries.move_to_end(name)
+        self.hits += 1
+        await self._evict_async()
+        return path, stat
+
+    async def open_partial(self) -> BinaryIO:
+        return await to_thread.run_sync(self._open_partial)
+
+    def _open_partial(self) -> BinaryIO:
+        return tempfile.NamedTemporaryFile(
+            dir=self.directory, suffix=PARTIAL_SUFFIX, delete=False
+        )  # type: ignore[return-value]
+
+    async def commit(self, name: str, partial: BinaryIO, size: int) -> None:
+        """Publish a fully written partial file as the entry for ``name``."""
+
+        await to_thread.run_sync(_publish, partial, self.directory / name)
+        self._forget(name)
+        self._entries[name] = size
+        self.total_bytes += size
+        await self._evict_async()
+
+    async def discard(self, partial: BinaryIO) -> None:
+        await to_thread.run_sync(_remove_partial, partial)
+
+    def _forget(self, name: str) -> None:
+        size = self._entries.pop(name, None)
+        if size is not None:
+            self.total_bytes -= size
+
+    def _pop_victims(self) -> list[Path]:
+        victims = []
+        while self.total_bytes > self.max_bytes and self._entries:
+            name, size = self._entries.popitem(last=False)
+            self.total_bytes -= size
+            self.evictions += 1
+            victims.append(self.directory / name)
+        return victims
+
+    def _evict(self) -> None:
+        _unlink_all(self._pop_victims())
+
+    async def _evict_async(self) -> None:
+        victims = self._pop_victims()
+        if victims:
+            await to_thread.run_sync(_unlink_all, victims)
+
+
+def _touch(path: Path) -> os.stat_result | None:
+    """Stat ``path`` and bump its modification time; ``None`` when it is gone."""
+
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    return stat
+
+
+def _publish(partial: BinaryIO, path: Path) -> None:
+    partial.close()
+    os.replace(partial.name, path)
+
+
+def _remove_partial(partial: BinaryIO) -> None:
+    partial.close()
+    Path(partial.name).unlink(missing_ok=True)
+
+
+def _unlink_all(paths: list[Path]) -> None:
+    for path in paths:
+        path.unlink(missing_ok=True)
+
+
+@lru_cache
+def get_asset_cache() -> AssetCache | None:
+    """Return the process-wide asset cache, or ``None`` when it is disabled."""
+
+    if settings.asset_cache_max_bytes <= 0:
+        return None
+    directory = settings.asset_cache_dir or os.path.join(tempfile.gettempdir(), "notable-assets")
+    try:
+        return AssetCache(
+            Path(directory), settings.asset_cache_max_bytes, settings.asset_cache_max_object_bytes
+        )
+    except OSError:
+        logger.exception("Asset cache directory %s is unusable; caching disabled", directory)
+        return None
+
+
+async def open_asset_cache() -> AssetCache | None:
+    """``get_asset_cache`` for the event loop: the first call scans the directory in a thread."""
+
+    if get_asset_cache.cache_info().currsize:
+        return get_asset_cache()
+    return await to_thread.run_sync(get_asset_cache)
+
+
+@register_collector
+def _collect_asset_cache() -> Iterable[MetricFamily]:
+    served = MetricFamily(
+        "notable_asset_bytes_served_total", "counter", "Asset bytes sent to clients by source."
+    )
+    for source, value in bytes_served.items():
+        served.add(value, source=source)
+
+    cache = get_asset_cache() if get_asset_cache.cache_info().currsize else None
+    if cache is None:
+        return [served]
+
+    hits = MetricFamily("notable_asset_cache_hits_total", "counter", "Asset downloads served from disk.")
+    misses = MetricFamily(
+        "notable_asset_cache_misses_total", "counter", "Asset downloads fetched from storage."
+    )
+    evictions = MetricFamily(
+        "notable_asset_cache_evictions_total", "counter", "Cache entries evicted to stay in budget."
+    )
+    size = MetricFamily("notable_asset_cache_bytes", "gauge", "Bytes currently held in the cache.")
+    entries = MetricFamily("notable_asset_cache_entries", "gauge", "Objects currently cached.")
+
+    hits.add(cache.hits)
+    misses.add(cache.misses)
+    evictions.add(cache.evictions)
+    size.add(cache.total_bytes)
+    entries.add(len(cache))
+    return [served, hits, misses, evictions, size, entries]
@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Generic, Iterable, TypeVar
+from uuid import UUID
+
+from .metrics import MetricFamily, register_collector
+
+logger = logging.getLogger(__name__)
+
+P = TypeVar("P")
+
+# Failed autosave writes by outcome, across all buffers.
+failed_writes = {"retried": 0, "dropped": 0}
+
+
+class DropSave(Exception):
+    """Raised by a writer when a payload can never be written, e.g. its note is gone."""
+
+
+class PendingSave(Generic[P]):
+    """The latest buffered payload for a note and when it was first and last saved."""
+
+    __slots__ = ("payload", "size", "saves", "first_at", "last_at", "failures")
+
+    def __init__(self, payload: P, size: int, now: float) -> None:
+        self.payload = payload
+        self.size = size
+        self.saves = 1
+        self.first_at = now
+        self.last_at = now
+        self.failures = 0
+
+
+class AutosaveBuffer(Generic[P]):
+    """Coalesce rapid successive saves per note into a single write.
+
+    Each submit replaces the note's pending payload. A note is written once it has
+    been idle for ``idle_seconds``, once its first unsaved edit is ``window_seconds``
+    old, as soon as a payload reaches ``max_bytes``, and on :meth:`stop`. A write
+    that fails is retried on the next tick unless the writer raises :class:`DropSave`.
+    """
+
+    def __init__(
+        self,
+        writer: Callable[[UUID, P], Awaitable[None]],
+        *,
+        window_seconds: float,
+        idle_seconds: float,
+        max_bytes: int,
+    ) -> None:
+        self._writer = writer
+        self.window_seconds = window_seconds
+        self.idle_seconds = idle_seconds
+        self.max_bytes = max_bytes
+        self._pending: dict[UUID, PendingSave[P]] = {}
+        self._flushing: dict[UUID, asyncio.Task[None]] = {}
+        self._ticker: asyncio.Task[None] | None = None
+
+    def submit(self, note_id: UUID, payload: P, size: int) -> PendingSave[P]:
+        now = time.monotonic()
+        pending = self._pending.get(note_id)
+        if pending is None:
+            pending = self._pending[note_id] = PendingSave(payload, size, now)
+        else:
+            pending.payload = payload
+            pending.size = size
+            pending.saves += 1
+            pending.last_at = now
+
+        if size >= self.max_bytes:
+            self._schedule_flush(note_id)
+        return pending
+
+    def has_pending(self, note_id: UUID) -> bool:
+        return note_id in self._pending or note_id in self._flushing
+
+    async def discard(self, note_id: UUID) -> None:
+        """Drop ``note_id``'s pending payload, waiting for any flush in progress."""
+
+        self._pending.pop(note_id, None)
+        in_flight = self._flushing.get(note_id)
+        if in_flight is not None:
+            await asyncio.shield(in_flight)
+            # A failed flush puts its payload back.
+            self._pending.pop(note_id, None)
+
+    async def flush_note(self, note_id: UUID) -> None:
+        """Write ``note_id``'s pending payload now, waiting for any flush in progress."""
+
+        in_flight = self._flushing.get(note_id)
+        if in_flight is not None:
+            await asyncio.shield(in_flight)
+        if note_id in self._pending:
+            await asyncio.shield(self._schedule_flush(note_id))
+
+    async def start(self) -> None:
+        if self._ticker is None:
+            self._ticker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the idle timer and write everything still buffered."""
+
+        if self._ticker is not None:
+            self._ticker.cancel()
+            try:
+                await self._ticker
+            except asyncio.CancelledError:
+                pass
+            self._ticker = None
+
+        for note_id in list(self._pending):
+            self._schedule_flush(note_id)
+        if self._flushing:
+            await asyncio.gather(*self._flushing.values(), return_exceptions=True)
+        for note_id, pending in self._pending.items():
+            logger.error(
+                "Dropping %s unwritten autosave(s) for note %s at shutdown", pending.saves, note_id
+            )
+        self._pending.clear()
+
+    def _schedule_flush(self, note_id: UUID) -> asyncio.Task[None]:
+        in_flight = self._flushing.get(note_id)
+        if in_flight is not None:
+            # Whatever arrives meanwhile is picked up by the next tick.
+            return in_flight
+        task = asyncio.create_task(self._flush(note_id))
+        self._flushing[note_id] = task
+        return task
+
+    async def _flush(self, note_id: UUID) -> None:
+        try:
+            pending = self._pending.pop(note_id, None)
+            if pending is None:
+                return
+            try:
+                await self._writer(note_id, pending.payload)
+            except DropSave:
+                failed_writes["dropped"] += 1
+                logger.warning(
+                    "Dropping %s coalesced autosave(s) for note %s",
+                    pending.saves,
+                    note_id,
+                    exc_info=True,
+                )
+            except Exception:
+                failed_writes["retried"] += 1
+                pending.failures += 1
+                logger.warning(
+                    "Autosave for note %s failed (attempt %s); retrying",
+                    note_id,
+                    pending.failures,
+                    exc_info=True,
+                )
+                self._restore(note_id, pending)
+        finally:
+            self._flushing.pop(note_id, None)
+
+    def _restore(self, note_id: UUID, pending: PendingSave[P]) -> None:
+        newer = self._pending.get(note_id)
+        if newer is None:
+            self._pending[note_id] = pending
+        else:
+            # The newer payload supersedes this one; it still owes these saves.
+            newer.saves += pending.saves
+            newer.first_at = min(newer.first_at, pending.first_at)
+            newer.failures = pending.failures
+
+    def _due(self, now: float) -> list[UUID]:
+        return [
+            note_id
+            for note_id, pending in self._pending.items()
+            if pending.failures
+            or now - pending.last_at >= self.idle_seconds
+            or now - pending.first_at >= self.window_seconds
+        ]
+
+    async def _run(self) -> None:
+        interval = max(min(self.idle_seconds, self.window_seconds) / 2, 0.05)
+        while True:
+            await asyncio.sleep(interval)
+            for note_id in self._due(time.monotonic()):
+                self._schedule_flush(note_id)
+
+
+@register_collector
+def _collect_autosave() -> Iterable[MetricFamily]:
+    failed = MetricFamily(
+        "notable_autosave_failed_writes_total", "counter", "Failed autosave writes by outcome."
+    )
+    for outcome, value in failed_writes.items():
+        failed.add(value, outcome=outcome)
+    return [failed]
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import logging
+
+from botocore.exceptions import ClientError
+from sqlalchemy import delete, select
+
+from . import storage
+from .dependencies import session_scope
+from .models import Blob
+
+logger = logging.getLogger(__name__)
+
+GC_BATCH_SIZE = 500
+
+
+async def collect_unreferenced_blobs() -> None:
+    """Delete stored objects that no asset refers to any more.
+
+    Rows are locked while their objects are deleted, so a concurrent upload of
+    the same content waits and then finds the object gone instead of losing it.
+    """
+
+    while True:
+        async with session_scope() as db:
+            rows = (
+                await db.execute(
+                    select(Blob.sha256, Blob.s3_key)
+                    .where(Blob.ref_count == 0)
+                    .limit(GC_BATCH_SIZE)
+                    .with_for_update(skip_locked=True)
+                )
+            ).all()
+            removed = []
+            for sha256, key in rows:
+                try:
+                    await storage.delete_object(key)
+                except ClientError:
+                    logger.warning("Could not delete unreferenced blob %s; will retry", sha256)
+                    continue
+                removed.append(sha256)
+            if removed:
+                await db.execute(delete(Blob).where(Blob.sha256.in_(removed)))
+            await db.commit()
+        if len(rows) < GC_BATCH_SIZE:
+            return
@@ -1,10 +1,11 @@
 from __future__ import annotations
 
 from functools import lru_cache
-from typing import List
+from typing import Annotated, List, Literal
 
 from pydantic import Field, PostgresDsn, field_validator
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, NoDecode
+from sqlalchemy.engine import make_url
 
 
 class Settings(BaseSettings):
@@ -19,21 +20,59 @@ class Settings(BaseSettings):
     db_port: int = Field(default=5432, validation_alias="DB_PORT")
     db_name: str = Field(default="app", validation_alias="DB_NAME")
     database_url: PostgresDsn | str | None = Field(default=None, validation_alias="DATABASE_URL")
+    db_mode: Literal["sync", "async"] = Field(default="sync", validation_alias="DB_MODE")
+    db_pool_size: int = Field(default=5, validation_alias="DB_POOL_SIZE")
+    db_max_overflow: int = Field(default=10, validation_alias="DB_MAX_OVERFLOW")
+    db_pool_timeout: float = Field(default=30.0, validation_alias="DB_POOL_TIMEOUT")
+    db_pool_recycle: int = Field(default=1800, validation_alias="DB_POOL_RECYCLE")
+    db_pool_pre_ping: bool = Field(default=True, validation_alias="DB_POOL_PRE_PING")
+    db_statement_timeout_ms: int | None = Field(default=None, validation_alias="DB_STATEMENT_TIMEOUT_MS")
+    db_slow_query_ms: float | None = Field(default=None, ge=0, validation_alias="DB_SLOW_QUERY_MS")
+    server_timing: bool = Field(default=True, validation_alias="SERVER_TIMING")
+    fast_json: bool = Field(default=False, validation_alias="FAST_JSON")
+    log_format: Literal["text", "json"] = Field(default="text", validation_alias="LOG_FORMAT")
+    log_sample_rate: float = Field(default=1.0, ge=0, le=1, validation_alias="LOG_SAMPLE_RATE")
+
+    database_replica_urls: Annotated[List[str], NoDecode] = Field(
+        default_factory=list, validation_alias="DATABASE_REPLICA_URLS"
+    )
+    replica_retry_seconds: float = Field(default=30.0, validation_alias="REPLICA_RETRY_SECONDS")
+    read_your_writes_seconds: float = Field(default=5.0, validation_alias="READ_YOUR_WRITES_SECONDS")
+
+    content_keyframe_interval: int = Field(default=20, ge=1, validation_alias="CONTENT_KEYFRAME_INTERVAL")
+    autosave_idle_seconds: float = Field(default=2.0, gt=0, validation_alias="AUTOSAVE_IDLE_SECONDS")
+    autosave_window_seconds: float = Field(default=15.0, gt=0, validation_alias="AUTOSAVE_WINDOW_SECONDS")
+    autosave_max_bytes: int = Field(default=262144, ge=1, validation_alias="AUTOSAVE_MAX_BYTES")
 
     s3_endpoint_url: str = Field(default="http://localhost:9000", validation_alias="S3_ENDPOINT_URL")
     s3_bucket: str = Field(default="notable", validation_alias="S3_BUCKET")
     s3_region: str = Field(default="us-east-1", validation_alias="S3_REGION")
     s3_access_key_id: str = Field(default="minioadmin", validation_alias="S3_ACCESS_KEY_ID")
     s3_secret_access_key: str = Field(default="minioadmin", validation_alias="S3_SECRET_ACCESS_KEY")
+    s3_public_endpoint_url: str | None = Field(default=None, validation_alias="S3_PUBLIC_ENDPOINT_URL")
+    s3_presign_expires_seconds: int = Field(default=900, ge=1, validation_alias="S3_PRESIGN_EXPIRES_SECONDS")
+    asset_max_bytes: int = Field(default=5 * 1024**3, ge=1, validation_alias="ASSET_MAX_BYTES")
+    asset_multipart_threshold: int = Field(
+        default=64 * 1024**2, ge=1, validation_alias="ASSET_MULTIPART_THRESHOLD"
+    )
+    asset_multipart_part_size: int = Field(
+        default=16 * 1024**2, ge=5 * 1024**2, validation_alias="ASSET_MULTIPART_PART_SIZE"
+    )
+    asset_cache_dir: str | None = Field(default=None, validation_alias="ASSET_CACHE_DIR")
+    asset_cache_max_bytes: int = Field(default=1024**3, ge=0, validation_alias="ASSET_CACHE_MAX_BYTES")
+    asset_cache_max_object_bytes: int = Field(
+        default=128 * 1024**2, ge=0, validation_alias="ASSET_CACHE_MAX_OBJECT_BYTES"
+    )
+    export_batch_size: int = Field(default=1000, ge=1, validation_alias="EXPORT_BATCH_SIZE")
 
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
 
-    @field_validator("cors_origins", mode="before")
+    @field_validator("cors_origins", "database_replica_urls", mode="before")
     @classmethod
     def split_cors_origins(cls, value: str | list[str]) -> list[str]:
-        """Parse comma-separated CORS origins."""
+        """Parse comma-separated CORS origins and replica URLs."""
 
         if isinstance(value, str):
             return [origin.strip() for origin in value.split(",") if origin.strip()]
@@ -47,6 +86,18 @@ class Settings(BaseSettings):
             return str(self.database_url)
         return f"postgresql+psycopg2://{self.db_user}:{self.db_password}@{self.db_host}:{self.db_port}/{self.db_name}"
 
+    @property
+    def assembled_async_database_url(self) -> str:
+        """Return the database URL rewritten for the asyncpg driver."""
+
+        return self.async_url(self.assembled_database_url)
+
+    @staticmethod
+    def async_url(url: str) -> str:
+        """Rewrite any PostgreSQL URL for the asyncpg driver."""
+
+        return make_url(url).set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+
 
 @lru_cache
 def get_settings() -> Settings:
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import copy
+from difflib import SequenceMatcher
+from typing import Any, List, Tuple
+
+JsonPatch = List[dict[str, Any]]
+TextPatch = List[Tuple[int, int, str]]
+
+
+def _escape_pointer(token: str | int) -> str:
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+
+def _pointer(path: list[str | int]) -> str:
+    return "".join(f"/{_escape_pointer(token)}" for token in path)
+
+
+def _parse_pointer(pointer: str) -> list[str]:
+    if not pointer:
+        return []
+    return [token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")]
+
+
+def _diff_into(source: Any, target: Any, path: list[str | int], ops: JsonPatch) -> None:
+    if source == target:
+        return
+
+    if isinstance(source, dict) and isinstance(target, dict):
+        for key in source.keys() - target.keys():
+            ops.append({"op": "remove", "path": _pointer([*path, key])})
+        for key, value in target.items():
+            if key in source:
+                _diff_into(source[key], value, [*path, key], ops)
+            else:
+                ops.append({"op": "add", "path": _pointer([*path, key]), "value": value})
+        return
+
+    if isinstance(source, list) and isinstance(target, list):
+        prefix = 0
+        limit = min(len(source), len(target))
+        while prefix < limit and source[prefix] == target[prefix]:
+            prefix += 1
+        suffix = 0
+        while suffix < limit - prefix and source[-1 - suffix] == target[-1 - suffix]:
+            suffix += 1
+
+        source_mid = source[prefix : len(source) - suffix]
+        target_mid = target[prefix : len(target) - suffix]
+        shared = min(len(source_mid), len(target_mid))
+        for offset in range(shared):
+            _diff_into(source_mid[offset], target_mid[offset], [*path, prefix + offset], ops)
+        for offset in reversed(range(shared, len(source_mid))):
+            ops.append({"op": "remove", "path": _pointer([*path, prefix + offset])})
+        for offset in range(shared, len(target_mid)):
+            ops.append(
+                {"op": "add", "path": _pointer([*path, prefix + offset]), "value": target_mid[offset]}
+            )
+        return
+
+    ops.append({"op": "replace", "path": _pointer(path), "value": target})
+
+
+def json_diff(source: Any, target: Any) -> JsonPatch:
+    """Return RFC 6902 ``add``/``remove``/``replace`` operations turning ``source`` into ``target``."""
+
+    ops: JsonPatch = []
+    _diff_into(source, target, [], ops)
+    return ops
+
+
+def json_apply(document: Any, patch: JsonPatch) -> Any:
+    """Apply a patch produced by :func:`json_diff` to a copy of ``document``."""
+
+    result = copy.deepcopy(document)
+    for op in patch:
+        tokens = _parse_pointer(op["path"])
+        if not tokens:
+            result = copy.deepcopy(op.get("value"))
+            continue
+
+        parent = result
+        for token in tokens[:-1]:
+            parent = parent[int(token)] if isinstance(parent, list) else parent[token]
+        last = tokens[-1]
+
+        if isinstance(parent, list):
+            index = int(last)
+            if op["op"] == "add":
+                parent.insert(index, copy.deepcopy(op["value"]))
+            elif op["op"] == "remove":
+                del parent[index]
+            else:
+                parent[index] = copy.deepcopy(op["value"])
+        elif op["op"] == "remove":
+            del parent[last]
+        else:
+            parent[last] = copy.deepcopy(op["value"])
+    return result
+
+
+def text_diff(source: str, target: str) -> TextPatch:
+    """Return line hunks ``(start, end, replacement)`` turning ``source`` into ``target``."""
+
+    source_lines = source.splitlines(keepends=True)
+    target_lines = target.splitlines(keepends=True)
+    matcher = SequenceMatcher(a=source_lines, b=target_lines, autojunk=False)
+    return [
+        (i1, i2, "".join(target_lines[j1:j2]))
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes()
+        if tag != "equal"
+    ]
+
+
+def text_apply(source: str, patch: TextPatch) -> str:
+    """Apply hunks produced by :func:`text_diff` to ``source``."""
+
+    source_lines = source.splitlines(keepends=True)
+    pieces: list[str] = []
+    cursor = 0
+    for start, end, replacement in patch:
+        pieces.extend(source_lines[cursor:start])
+        pieces.append(replacement)
+        cursor = end
+    pieces.extend(source_lines[cursor:])
+    return "".join(pieces)
@@ -1,40 +1,323 @@
 from __future__ import annotations
 
+import itertools
 import logging
+import time
 from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Iterator, Sequence, TypeVar
 
-from sqlalchemy import create_engine
+from fastapi import FastAPI, Request
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, Result, Row
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from .asset_cache import open_asset_cache
 from .config import get_settings
+from .metrics import InstrumentedAsyncAdaptedQueuePool, InstrumentedQueuePool, register_engine
+from .query_stats import instrument_engine
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 settings = get_settings()
-engine = create_engine(settings.assembled_database_url, pool_pre_ping=True)
+
+
+def _engine_options(*, asyncpg: bool) -> dict[str, Any]:
+    """Pool and connection options shared by every engine, read from ``Settings``."""
+
+    options: dict[str, Any] = {
+        "poolclass": InstrumentedAsyncAdaptedQueuePool if asyncpg else InstrumentedQueuePool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+    if settings.db_statement_timeout_ms:
+        timeout = str(settings.db_statement_timeout_ms)
+        if asyncpg:
+            options["connect_args"] = {"server_settings": {"statement_timeout": timeout}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={timeout}"}
+    return options
+
+
+engine = create_engine(settings.assembled_database_url, **_engine_options(asyncpg=False))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = (
+    create_async_engine(settings.assembled_async_database_url, **_engine_options(asyncpg=True))
+    if settings.db_mode == "async"
+    else None
+)
+register_engine("primary", async_engine if async_engine is not None else engine)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
+replica_engines: list[Engine | AsyncEngine] = [
+    create_async_engine(settings.async_url(url), **_engine_options(asyncpg=True))
+    if async_engine is not None
+    else create_engine(url, **_engine_options(asyncpg=False))
+    for url in settings.database_replica_urls
+]
+for _index, _replica in enumerate(replica_engines):
+    register_engine(f"replica-{_index}", _replica)
+
+for _engine in [engine, async_engine, *replica_engines]:
+    if _engine is not None:
+        instrument_engine(_engine.sync_engine if isinstance(_engine, AsyncEngine) else _engine)
+
+_replica_cursor = itertools.count()
+_replica_down_until: dict[int, float] = {}
+
+READ_PRIMARY_COOKIE = "notable_read_primary_until"
+_COMMITTED = "committed_to_primary"
+
+
+class SyncStreamResult:
+    """Async view of a sync ``Result`` backed by a server-side cursor."""
+
+    def __init__(self, result: Result) -> None:
+        self.result = result
+
+    async def partitions(self, size: int | None = None) -> AsyncIterator[Sequence[Row]]:
+        partitions: Iterator[Sequence[Row]] = self.result.partitions(size)
+        while True:
+            partition = await run_in_threadpool(next, partitions, None)
+            if partition is None:
+                return
+            yield partition
+
+    async def close(self) -> None:
+        await run_in_threadpool(self.result.close)
+
+
+class SyncSessionAdapter:
+    """Expose a synchronous ``Session`` through the ``AsyncSession`` call surface.
+
+    Every call that may touch the database runs in the threadpool, so handlers are
+    written once against the async API and ``DB_MODE`` picks the driver underneath.
+    """
+
+    def __init__(self, sync_session: Session) -> None:
+        self.sync_session = sync_session
+
+    def add(self, instance: object) -> None:
+        self.sync_session.add(instance)
+
+    def add_all(self, instances: list[object]) -> None:
+        self.sync_session.add_all(instances)
+
+    async def execute(self, *args: Any, **kwargs: Any):
+        return await run_in_threadpool(self.sync_session.execute, *args, **kwargs)
+
+    async def scalar(self, *args: Any, **kwargs: Any):
+        return await run_in_threadpool(self.sync_session.scalar, *args, **kwargs)
+
+    async def scalars(self, *args: Any, **kwargs: Any):
+        return await run_in_threadpool(self.sync_session.scalars, *args, **kwargs)
+
+    async def get(self, *args: Any, **kwargs: Any):
+        return await run_in_threadpool(self.sync_session.get, *args, **kwargs)
+
+    async def stream(self, statement: Any, *args: Any, **kwargs: Any) -> SyncStreamResult:
+        statement = statement.execution_options(stream_results=True)
+        result = await run_in_threadpool(self.sync_session.execute, statement, *args, **kwargs)
+        return SyncStreamResult(result)
+
+    async def flush(self, objects: list[object] | None = None) -> None:
+        await run_in_threadpool(self.sync_session.flush, objects)
+
+    async def refresh(self, instance: object, attribute_names: list[str] | None = None) -> None:
+        await run_in_threadpool(self.sync_session.refresh, instance, attribute_names)
+
+    async def delete(self, instance: object) -> None:
+        await run_in_threadpool(self.sync_session.delete, instance)
+
+    async def commit(self) -> None:
+        await run_in_threadpool(self.sync_session.commit)
+
+    async def rollback(self) -> None:
+        await run_in_threadpool(self.sync_session.rollback)
+
+    async def close(self) -> None:
+        await run_in_threadpool(self.sync_session.close)
+
+    async def connection(self):
+        return await run_in_threadpool(self.sync_session.connection)
+
+    async def run_sync(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        return await run_in_threadpool(fn, self.sync_session, *args, **kwargs)
+
+
+def _new_session(bind: Engine | AsyncEngine | None = None) -> AsyncSession:
+    if async_engine is not None:
+        return AsyncSessionLocal(bind=bind or async_engine)
+    return SyncSessionAdapter(  # type: ignore[return-value]
+        SessionLocal(bind=bind or engine, expire_on_commit=False)
+    )
 
-async def get_db() -> Session:
-    """Provide a scoped database session."""
 
-    db = SessionLocal()
+async def _open_replica_session() -> AsyncSession | None:
+    """Return a connected session on the next healthy replica, if any."""
+
+    now = time.monotonic()
+    start = next(_replica_cursor)
+    for offset in range(len(replica_engines)):
+        index = (start + offset) % len(replica_engines)
+        if _replica_down_until.get(index, 0.0) > now:
+            continue
+
+        session = _new_session(replica_engines[index])
+        try:
+            await session.connection()
+        except (DBAPIError, OSError, PoolTimeoutError):
+            logger.warning(
+                "Read replica %s unavailable; retrying in %.0fs",
+                index,
+                settings.replica_retry_seconds,
+            )
+            _replica_down_until[index] = now + settings.replica_retry_seconds
+            await session.close()
+            continue
+        _replica_down_until.pop(index, None)
+        return session
+    return None
+
+
+@asynccontextmanager
+async def session_scope() -> AsyncIterator[AsyncSession]:
+    """Open a session for work outside a request, e.g. background tasks."""
+
+    session = _new_session()
+    try:
+        yield session
+    finally:
+        await session.close()
+
+
+@asynccontextmanager
+async def read_session_scope() -> AsyncIterator[AsyncSession]:
+    """Like ``session_scope`` but on a healthy replica when one is configured."""
+
+    session = await _open_replica_session() if replica_engines else None
+    if session is None:
+        session = _new_session()
     try:
+        yield session
+    finally:
+        await session.close()
+
+
+async def get_db(request: Request) -> AsyncIterator[AsyncSession]:
+    """Provide a scoped database session on the primary.
+
+    A commit on the session pins the client's reads to the primary; see
+    ``ReadYourWritesMiddleware``.
+    """
+
+    async with session_scope() as db:
+        if replica_engines and settings.read_your_writes_seconds > 0:
+            event.listen(
+                db.sync_session, "after_commit", lambda _: setattr(request.state, _COMMITTED, True)
+            )
         yield db
+
+
+class ReadYourWritesMiddleware:
+    """Set the read-primary cookie on responses to requests that committed a write.
+
+    The cookie goes on the response actually sent, so requests that fail
+    before committing, or that never write, leave the client on the replicas.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not replica_engines or settings.read_your_writes_seconds <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        state = scope.setdefault("state", {})
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and state.get(_COMMITTED):
+                # Pin this client's reads to the primary until replicas catch up.
+                seconds = settings.read_your_writes_seconds
+                MutableHeaders(scope=message).append(
+                    "Set-Cookie",
+                    f"{READ_PRIMARY_COOKIE}={time.time() + seconds}; "
+                    f"HttpOnly; Max-Age={max(int(seconds), 1)}; Path=/; SameSite=lax",
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+def _reads_pinned_to_primary(request: Request) -> bool:
+    try:
+        return float(request.cookies.get(READ_PRIMARY_COOKIE, "0")) > time.time()
+    except ValueError:
+        return False
+
+
+async def get_read_db(request: Request) -> AsyncIterator[AsyncSession]:
+    """Provide a read-only session, load-balanced across replicas when configured.
+
+    Falls back to the primary when no replica is reachable or when the client
+    wrote recently and must read its own writes.
+    """
+
+    session = None
+    if replica_engines and not _reads_pinned_to_primary(request):
+        session = await _open_replica_session()
+    if session is None:
+        session = _new_session()
+
+    try:
+        yield session
     finally:
-        db.close()
+        await session.close()
 
 
 @asynccontextmanager
-def lifespan_context():
+async def lifespan_context(app: FastAPI) -> AsyncIterator[None]:
     """Manage application startup and shutdown activities."""
 
-    logger.info("Opening database engine")
+    # Imported here: the contents router depends on this module.
+    from .routers.contents import autosave_buffer
+
+    logger.info("Opening database engine (%s mode)", settings.db_mode)
     try:
         # Initialize engine by connecting once.
-        with engine.connect():
-            logger.info("Database connection established")
+        if async_engine is not None:
+            async with async_engine.connect():
+                logger.info("Database connection established")
+        else:
+            with engine.connect():
+                logger.info("Database connection established")
+        await autosave_buffer.start()
+        # Scan the asset cache directory now rather than on the first download.
+        await open_asset_cache()
         yield
     finally:
+        await autosave_buffer.stop()
         logger.info("Disposing database engine")
         engine.dispose()
+        if async_engine is not None:
+            await async_engine.dispose()
+        for replica in replica_engines:
+            if isinstance(replica, AsyncEngine):
+                await replica.dispose()
+            else:
+                replica.dispose()
@@ -0,0 +1,363 @@
+"""Bulk import of workspace dumps produced by ``GET /export``.
+
+The dump is streamed into the database with ``COPY`` as raw JSON lines; every
+later step is a set-wise ``INSERT ... SELECT`` from that staging table, so rows
+never become Python objects. Imported rows get fresh ids, and references
+between them are rewritten through temporary old-to-new id tables.
+"""
+
+from __future__ import annotations
+
+import gzip
+import logging
+import uuid
+from typing import IO, Any, Callable
+from uuid import UUID
+
+import psycopg2
+from botocore.exceptions import ClientError
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import DataError
+
+from . import storage
+from .dependencies import engine
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_VERSIONS = {1}
+
+# Bytes of dump read between two "copy" progress reports.
+PROGRESS_BYTES = 8 * 1024 * 1024
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+Progress = Callable[..., None]
+
+
+class ImportFailed(Exception):
+    """The dump is invalid or conflicts with existing data; nothing was written."""
+
+
+class _ProgressReader:
+    """File wrapper that reports how many bytes ``COPY`` has consumed."""
+
+    def __init__(self, stream: IO[bytes], progress: Progress) -> None:
+        self.stream = stream
+        self.progress = progress
+        self.bytes_read = 0
+        self._next_report = PROGRESS_BYTES
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.stream.read(size)
+        self.bytes_read += len(data)
+        if self.bytes_read >= self._next_report:
+            self.progress("copy", bytes=self.bytes_read)
+            self._next_report = self.bytes_read + PROGRESS_BYTES
+        return data
+
+    readline = read
+
+
+def _open_dump(stream: IO[bytes]) -> IO[bytes]:
+    """Transparently decompress gzip dumps; ``stream`` must be seekable."""
+
+    magic = stream.read(2)
+    stream.seek(0)
+    if magic == GZIP_MAGIC:
+        return gzip.GzipFile(fileobj=stream, mode="rb")  # type: ignore[return-value]
+    return stream
+
+
+def _staged(table: str) -> str:
+    """FROM clause exposing each staged line's data as a ``table`` row named ``s``."""
+
+    return f"import_raw r CROSS JOIN LATERAL jsonb_populate_record(NULL::{table}, r.doc->'data') s"
+
+
+def _copy_dump(conn: Connection, stream: IO[bytes], progress: Progress) -> None:
+    conn.exec_driver_sql("CREATE TEMP TABLE import_raw (doc jsonb) ON COMMIT DROP")
+    reader = _ProgressReader(_open_dump(stream), progress)
+    cursor = conn.connection.dbapi_connection.cursor()  # type: ignore[union-attr]
+    try:
+        # CSV with quote and delimiter bytes that valid JSON never contains unescaped,
+        # so each line lands verbatim in ``doc``; blank lines become NULL.
+        cursor.copy_expert(
+            "COPY import_raw (doc) FROM STDIN WITH (FORMAT csv, QUOTE e'\\x01', DELIMITER e'\\x02')",
+            reader,
+        )
+    finally:
+        cursor.close()
+    conn.exec_driver_sql("DELETE FROM import_raw WHERE doc IS NULL")
+    conn.exec_driver_sql("ANALYZE import_raw")
+    progress("copy", bytes=reader.bytes_read, done=True)
+
+
+def _check_dump(conn: Connection) -> dict[str, int]:
+    """Validate the header and trailer lines; return the row count per type."""
+
+    headers = conn.exec_driver_sql(
+        "SELECT doc->'data'->>'version' FROM import_raw WHERE doc->>'type' = 'export'"
+    ).all()
+    if len(headers) != 1:
+        raise ImportFailed("Dump must contain exactly one export header")
+    if headers[0][0] is None or int(headers[0][0]) not in SUPPORTED_VERSIONS:
+        raise ImportFailed(f"Unsupported export version {headers[0][0]}")
+
+    trailer = conn.exec_driver_sql(
+        "SELECT doc->'data'->'counts' FROM import_raw WHERE doc->>'type' = 'end'"
+    ).scalar()
+    if trailer is None:
+        raise ImportFailed("Dump is truncated: no end record")
+
+    counts = dict(
+        conn.exec_driver_sql(
+            "SELECT doc->>'type', count(*) FROM import_raw "
+            "WHERE doc->>'type' NOT IN ('export', 'end') GROUP BY 1"
+        ).all()
+    )
+    for kind, expected in trailer.items():
+        if counts.get(kind, 0) != expected:
+            raise ImportFailed(f"Dump is incomplete: expected {expected} {kind} rows, found {counts.get(kind, 0)}")
+    if counts.get("user", 0) != 1:
+        raise ImportFailed("Dump must contain exactly one user")
+    return counts
+
+
+def _import_user(conn: Connection, target_user_id: UUID | None) -> UUID:
+    email, name, created_at, updated_at = conn.exec_driver_sql(
+        "SELECT s.email, s.name, s.created_at, s.updated_at "
+        f"FROM {_staged('users')} WHERE r.doc->>'type' = 'user'"
+    ).one()
+    if target_user_id is not None:
+        exists = conn.exec_driver_sql(
+            "SELECT 1 FROM users WHERE id = %(id)s", {"id": target_user_id}
+        ).scalar()
+        if not exists:
+            raise ImportFailed(f"Target user {target_user_id} does not exist")
+        return target_user_id
+
+    taken = conn.exec_driver_sql("SELECT 1 FROM users WHERE email = %(email)s", {"email": email}).scalar()
+    if taken:
+        raise ImportFailed(f"A user with email {email} already exists; import into it with user_id")
+    user_id = uuid.uuid4()
+    conn.exec_driver_sql(
+        "INSERT INTO users (id, email, name, created_at, updated_at) "
+        "VALUES (%(id)s, %(email)s, %(name)s, %(created_at)s, %(updated_at)s)",
+        {"id": user_id, "email": email, "name": name, "created_at": created_at, "updated_at": updated_at},
+    )
+    return user_id
+
+
+def _import_tags(conn: Connection, user_id: UUID) -> int:
+    """Map dumped tags onto existing ones by slug or name and create the rest."""
+
+    conn.exec_driver_sql(
+        "CREATE TEMP TABLE import_tags ON COMMIT DROP AS "
+        "SELECT s.id AS old_id, NULL::uuid AS new_id, "
+        "CASE WHEN s.user_id IS NULL THEN NULL ELSE %(user_id)s::uuid END AS user_id, "
+        "s.name, s.slug, s.created_at, s.updated_at "
+        f"FROM {_staged('tags')} WHERE r.doc->>'type' = 'tag'",
+        {"user_id": user_id},
+    )
+    reuse = (
+        "UPDATE import_tags i SET new_id = ("
+        " SELECT e.id FROM tags e WHERE e.user_id IS NOT DISTINCT FROM i.user_id"
+        " AND (e.slug = i.slug OR e.name = i.name) ORDER BY e.slug = i.slug DESC LIMIT 1"
+        ") WHERE i.new_id IS NULL OR NOT EXISTS (SELECT 1 FROM tags e WHERE e.id = i.new_id)"
+    )
+    conn.exec_driver_sql(reuse)
+    created = conn.exec_driver_sql(
+        "WITH fresh AS ("
+        " UPDATE import_tags SET new_id = gen_random_uuid() WHERE new_id IS NULL"
+        " RETURNING new_id, user_id, name, slug, created_at, updated_at"
+        ") INSERT INTO tags (id, user_id, name, slug, created_at, updated_at)"
+        " SELECT * FROM fresh ON CONFLICT DO NOTHING"
+    ).rowcount
+    # A concurrent writer may have created one of them first; adopt its row instead.
+    conn.exec_driver_sql(reuse)
+    unresolved = conn.exec_driver_sql(
+        "SELECT i.slug FROM import_tags i WHERE i.new_id IS NULL"
+        " OR NOT EXISTS (SELECT 1 FROM tags e WHERE e.id = i.new_id) ORDER BY i.slug LIMIT 1"
+    ).scalar()
+    if unresolved is not None:
+        raise ImportFailed(f"Tag {unresolved!r} conflicts with existing tags and could not be mapped")
+    conn.exec_driver_sql("ALTER TABLE import_tags ADD PRIMARY KEY (old_id)")
+    return created
+
+
+def _import_notes(conn: Connection, user_id: UUID) -> int:
+    """Insert notes under fresh ids, relinking parents and rebuilding paths."""
+
+    conn.exec_driver_sql(
+        "CREATE TEMP TABLE import_notes ON COMMIT DROP AS "
+        "SELECT s.id AS old_id, gen_random_uuid() AS new_id, s.parent_id AS old_parent_id, "
+        "s.title, s.slug, s.order_index, s.metadata, s.type, s.created_at, s.updated_at "
+        f"FROM {_staged('notes')} WHERE r.doc->>'type' = 'note'"
+    )
+    conn.exec_driver_sql("ALTER TABLE import_notes ADD PRIMARY KEY (old_id)")
+    conn.exec_driver_sql("CREATE INDEX ON import_notes (old_parent_id)")
+    conn.exec_driver_sql("ANALYZE import_notes")
+    # Slugs are globally unique; suffix the ones already taken with the new id.
+    conn.exec_driver_sql(
+        "UPDATE import_notes i SET slug = left(i.slug, 246) || '-' || left(i.new_id::text, 8) "
+        "WHERE EXISTS (SELECT 1 FROM notes n WHERE n.slug = i.slug)"
+    )
+    # Notes whose parent is not part of the dump become roots.
+    inserted = conn.exec_driver_sql(
+        "WITH RECURSIVE tree AS ("
+        " SELECT i.old_id, i.new_id, NULL::uuid AS parent_id, '/' || i.new_id || '/' AS path"
+        " FROM import_notes i"
+        " WHERE NOT EXISTS (SELECT 1 FROM import_notes p WHERE p.old_id = i.old_parent_id)"
+        " UNION ALL"
+        " SELECT c.old_id, c.new_id, t.new_id, t.path || c.new_id || '/'"
+        " FROM tree t JOIN import_notes c ON c.old_parent_id = t.old_id"
+        ") INSERT INTO notes (id, user_id, title, slug, parent_id, order_index, path, metadata, type,"
+        " created_at, updated_at)"
+        " SELECT i.new_id, %(user_id)s, i.title, i.slug, t.parent_id, i.order_index, t.path,"
+        " coalesce(i.metadata, '{}'::jsonb), i.type, i.created_at, i.updated_at"
+        " FROM tree t JOIN import_notes i USING (old_id)",
+        {"user_id": user_id},
+    ).rowcount
+    staged = conn.exec_driver_sql("SELECT count(*) FROM import_notes").scalar_one()
+    if inserted != staged:
+        raise ImportFailed(f"{staged - inserted} notes sit in a parent cycle")
+    return inserted
+
+
+def _import_contents(conn: Connection) -> int:
+    return conn.exec_driver_sql(
+        "INSERT INTO note_contents (note_id, version, tiptap_json, markdown, is_delta,"
+        " tiptap_patch, markdown_patch, updated_at)"
+        " SELECT m.new_id, s.version, s.tiptap_json, s.markdown, coalesce(s.is_delta, false),"
+        " s.tiptap_patch, s.markdown_patch, coalesce(s.updated_at, now())"
+        f" FROM {_staged('note_contents')} JOIN import_notes m ON m.old_id = s.note_id"
+        " WHERE r.doc->>'type' = 'note_content'"
+    ).rowcount
+
+
+def _import_note_tags(conn: Connection) -> int:
+    return conn.exec_driver_sql(
+        "INSERT INTO note_tags (note_id, tag_id)"
+        " SELECT DISTINCT n.new_id, t.new_id"
+        f" FROM {_staged('note_tags')}"
+        " JOIN import_notes n ON n.old_id = s.note_id JOIN import_tags t ON t.old_id = s.tag_id"
+        " WHERE r.doc->>'type' = 'note_tag'"
+        " ON CONFLICT DO NOTHING"
+    ).rowcount
+
+
+def _promote_legacy_objects(conn: Connection) -> None:
+    """Give every blob-less asset in the dump a content-addressed copy of its object.
+
+    Such assets own their object outright and deleting one deletes the object, so
+    an imported copy must not share the original's key. Results land in the
+    ``import_objects`` temp table, keyed by the original ``source_key``.
+    """
+
+    conn.exec_driver_sql(
+        "CREATE TEMP TABLE import_objects"
+        " (source_key text PRIMARY KEY, sha256 text NOT NULL, s3_key text NOT NULL, size bigint NOT NULL)"
+        " ON COMMIT DROP"
+    )
+    keys = (
+        conn.exec_driver_sql(
+            f"SELECT DISTINCT s.s3_key FROM {_staged('assets')}"
+            " WHERE r.doc->>'type' = 'asset' AND s.blob_sha256 IS NULL"
+        )
+        .scalars()
+        .all()
+    )
+    rows = []
+    for key in keys:
+        try:
+            sha256, size = storage.copy_to_blob(key)
+        except ClientError as exc:
+            if not storage.is_not_found(exc):
+                raise
+            # Nothing left to share; the imported row keeps the dangling key as is.
+            logger.warning("Object %s of an imported asset is missing", key)
+            continue
+        rows.append({"key": key, "sha256": sha256, "blob_key": storage.blob_key(sha256), "size": size})
+    if rows:
+        conn.exec_driver_sql(
+            "INSERT INTO import_objects VALUES (%(key)s, %(sha256)s, %(blob_key)s, %(size)s)", rows
+        )
+
+
+def _import_assets(conn: Connection) -> int:
+    """Copy asset rows, pointing them at content-addressed blobs.
+
+    Blob rows are not part of a dump, so any missing one is recreated from the
+    asset pointing at it, or from the promoted object of a blob-less asset. The
+    ``assets`` trigger then counts the new references.
+    """
+
+    _promote_legacy_objects(conn)
+    conn.exec_driver_sql(
+        "INSERT INTO blobs (sha256, s3_key, size, mime)"
+        " SELECT DISTINCT ON (b.sha256) b.sha256, b.s3_key, b.size, b.mime FROM ("
+        "  SELECT s.blob_sha256 AS sha256, s.s3_key, coalesce(s.size, 0) AS size, s.mime"
+        f"  FROM {_staged('assets')}"
+        "  WHERE r.doc->>'type' = 'asset' AND s.blob_sha256 IS NOT NULL"
+        "  UNION ALL"
+        "  SELECT o.sha256, o.s3_key, o.size, s.mime"
+        f"  FROM {_staged('assets')} JOIN import_objects o ON o.source_key = s.s3_key"
+        "  WHERE r.doc->>'type' = 'asset' AND s.blob_sha256 IS NULL"
+        " ) b"
+        " ORDER BY b.sha256"
+        " ON CONFLICT DO NOTHING"
+    )
+    return conn.exec_driver_sql(
+        "INSERT INTO assets (id, note_id, blob_sha256, s3_key, mime, size, created_at, updated_at)"
+        " SELECT gen_random_uuid(), m.new_id, coalesce(s.blob_sha256, o.sha256),"
+        " coalesce(b.s3_key, s.s3_key), s.mime, s.size,"
+        " coalesce(s.created_at, now()), coalesce(s.updated_at, now())"
+        f" FROM {_staged('assets')} JOIN import_notes m ON m.old_id = s.note_id"
+        " LEFT JOIN import_objects o ON s.blob_sha256 IS NULL AND o.source_key = s.s3_key"
+        " LEFT JOIN blobs b ON b.sha256 = o.sha256"
+        " WHERE r.doc->>'type' = 'asset'"
+    ).rowcount
+
+
+def import_workspace(
+    stream: IO[bytes],
+    *,
+    target_user_id: UUID | None = None,
+    progress: Progress | None = None,
+) -> dict[str, Any]:
+    """Import an export dump (plain or gzipped NDJSON) in a single transaction.
+
+    The dump's user is created under a new id, or mapped onto ``target_user_id``
+    when given. ``progress(stage, **fields)`` is called as each stage completes.
+    Raises ``ImportFailed`` for invalid dumps and conflicts; blocks, so run it in
+    a worker thread from async code.
+    """
+
+    report: Progress = progress or (lambda stage, **fields: None)
+    with engine.begin() as conn:
+        try:
+            _copy_dump(conn, stream, report)
+            staged = _check_dump(conn)
+        except (psycopg2.DataError, DataError) as exc:
+            # Malformed JSON or values; PostgreSQL's message names the offending line.
+            orig = getattr(exc, "orig", exc)
+            raise ImportFailed(f"Invalid dump: {str(orig).strip()}") from exc
+        report("validate", rows=staged)
+
+        user_id = _import_user(conn, target_user_id)
+        report("user", user_id=user_id)
+        tags_created = _import_tags(conn, user_id)
+        report("tags", created=tags_created)
+        counts = {
+            "notes": _import_notes(conn, user_id),
+        }
+        report("notes", rows=counts["notes"])
+        counts["note_contents"] = _import_contents(conn)
+        report("note_contents", rows=counts["note_contents"])
+        counts["note_tags"] = _import_note_tags(conn)
+        report("note_tags", rows=counts["note_tags"])
+        counts["assets"] = _import_assets(conn)
+        report("assets", rows=counts["assets"])
+
+    logger.info("Imported workspace into user %s: %s", user_id, counts)
+    return {"user_id": user_id, "tags_created": tags_created, **counts}
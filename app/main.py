@@ -1,38 +1,91 @@
 from __future__ import annotations
 
 import logging
+import random
 import time
-from typing import Callable
 
-from fastapi import FastAPI, Request
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from .config import get_settings
-from .dependencies import lifespan_context
-from .routers import notes, tags
+from .dependencies import ReadYourWritesMiddleware, lifespan_context
+from .logging_config import configure_logging
+from .metrics import HTTPMetricsMiddleware
+from .query_stats import QueryStats, format_slowest, track_queries
+from .routers import assets, contents, export, imports, metrics, notes, tags
 
 logger = logging.getLogger(__name__)
-logging.basicConfig(level=logging.INFO)
+configure_logging()
 
 settings = get_settings()
 
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    """Simple request logging middleware."""
+class LoggingMiddleware:
+    """Request logging middleware, including the database work each request did.
+
+    A plain ASGI middleware: the response streams through untouched, and the
+    line is logged once the body has been sent. Server errors are always logged;
+    other requests are sampled at ``LOG_SAMPLE_RATE``.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-    async def dispatch(self, request: Request, call_next: Callable):  # type: ignore[override]
         start_time = time.perf_counter()
-        response = await call_next(request)
-        process_time_ms = (time.perf_counter() - start_time) * 1000
+        status_code = 500
+
+        with track_queries() as queries:
+
+            async def send_wrapper(message: Message) -> None:
+                nonlocal status_code
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                    if settings.server_timing:
+                        elapsed_ms = (time.perf_counter() - start_time) * 1000
+                        MutableHeaders(scope=message).append(
+                            "Server-Timing", f"{queries.server_timing()}, app;dur={elapsed_ms:.2f}"
+                        )
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                if status_code >= 500 or random.random() < settings.log_sample_rate:
+                    self._log(scope, status_code, (time.perf_counter() - start_time) * 1000, queries)
+
+    @staticmethod
+    def _log(scope: Scope, status_code: int, process_time_ms: float, queries: QueryStats) -> None:
         logger.info(
-            "%s %s - status: %s - %.2fms",
-            request.method,
-            request.url.path,
-            response.status_code,
+            "%s %s - status: %s - %.2fms - db: %d queries %.2fms - slowest: %.2fms %s",
+            scope["method"],
+            scope["path"],
+            status_code,
             process_time_ms,
+            queries.count,
+            queries.seconds * 1000,
+            queries.slowest_seconds * 1000,
+            format_slowest(queries),
+            extra={
+                "fields": {
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "route": getattr(scope.get("route"), "path", None),
+                    "status": status_code,
+                    "duration_ms": round(process_time_ms, 2),
+                    "db_queries": queries.count,
+                    "db_ms": round(queries.seconds * 1000, 2),
+                    "db_slowest_ms": round(queries.slowest_seconds * 1000, 2),
+                    "db_slowest": queries.slowest_statement,
+                }
+            },
         )
-        return response
 
 
 app = FastAPI(title=settings.app_name, lifespan=lifespan_context)
@@ -44,10 +97,19 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(ReadYourWritesMiddleware)
 app.add_middleware(LoggingMiddleware)
+# Added last so it is outermost and times the whole middleware stack.
+app.add_middleware(HTTPMetricsMiddleware)
 
 app.include_router(notes.router)
+app.include_router(contents.router)
+app.include_router(assets.router)
+app.include_router(assets.download_router)
 app.include_router(tags.router)
+app.include_router(export.router)
+app.include_router(imports.router)
+app.include_router(metrics.router)
 
 
 @app.get("/health", tags=["health"])
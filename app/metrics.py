@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+import time
+from bisect import bisect_left
+from typing import Callable, Iterable, Iterator
+
+from anyio.to_thread import current_default_thread_limiter
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class MetricFamily:
+    """A named metric with its samples, rendered in Prometheus text format."""
+
+    __slots__ = ("name", "kind", "help", "samples")
+
+    def __init__(self, name: str, kind: str, help: str) -> None:
+        self.name = name
+        self.kind = kind
+        self.help = help
+        self.samples: list[tuple[str, dict[str, str], float]] = []
+
+    def add(self, value: float, suffix: str = "", **labels: str) -> None:
+        self.samples.append((suffix, labels, value))
+
+
+Collector = Callable[[], Iterable[MetricFamily]]
+
+_collectors: list[Collector] = []
+
+
+def register_collector(collector: Collector) -> Collector:
+    """Register a callable that yields metric families on every scrape."""
+
+    _collectors.append(collector)
+    return collector
+
+
+def _escape_label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape_label(value)}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def _render_lines() -> Iterator[str]:
+    for collector in _collectors:
+        for family in collector():
+            yield f"# HELP {family.name} {family.help}"
+            yield f"# TYPE {family.name} {family.kind}"
+            for suffix, labels, value in family.samples:
+                yield f"{family.name}{suffix}{_format_labels(labels)} {_format_value(value)}"
+
+
+def render_metrics() -> str:
+    """Render all registered collectors in the Prometheus exposition format."""
+
+    return "\n".join(_render_lines()) + "\n"
+
+
+class PoolStats:
+    """Checkout wait statistics recorded by the instrumented pools."""
+
+    __slots__ = ("waits", "wait_seconds", "max_wait_seconds", "timeouts")
+
+    def __init__(self) -> None:
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.timeouts = 0
+
+
+class _InstrumentedPoolMixin:
+    """Time how long each checkout waits for a free connection."""
+
+    def __init__(self, *args, **kwargs) -> None:  # type: ignore[no-untyped-def]
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):  # type: ignore[no-untyped-def]
+        start = time.perf_counter()
+        try:
+            return super()._do_get()  # type: ignore[misc]
+        except Exception:
+            self.stats.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            self.stats.waits += 1
+            self.stats.wait_seconds += waited
+            if waited > self.stats.max_wait_seconds:
+                self.stats.max_wait_seconds = waited
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncAdaptedQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+_engines: dict[str, Engine | AsyncEngine] = {}
+
+
+def register_engine(name: str, engine: Engine | AsyncEngine) -> None:
+    """Publish live pool statistics for ``engine`` under the ``pool`` label ``name``."""
+
+    _engines[name] = engine
+
+
+@register_collector
+def _collect_pools() -> Iterable[MetricFamily]:
+    size = MetricFamily("notable_db_pool_size", "gauge", "Configured persistent connections.")
+    checked_out = MetricFamily(
+        "notable_db_pool_checked_out", "gauge", "Connections currently checked out."
+    )
+    checked_in = MetricFamily("notable_db_pool_checked_in", "gauge", "Idle connections in the pool.")
+    overflow = MetricFamily(
+        "notable_db_pool_overflow", "gauge", "Connections open beyond pool_size."
+    )
+    waits = MetricFamily("notable_db_pool_checkouts_total", "counter", "Connection checkouts.")
+    wait_seconds = MetricFamily(
+        "notable_db_pool_wait_seconds_total", "counter", "Time spent waiting for a connection."
+    )
+    max_wait = MetricFamily(
+        "notable_db_pool_wait_seconds_max", "gauge", "Longest single checkout wait."
+    )
+    timeouts = MetricFamily(
+        "notable_db_pool_checkout_errors_total", "counter", "Checkouts that timed out or failed."
+    )
+
+    for name, engine in _engines.items():
+        pool = engine.pool
+        if isinstance(pool, QueuePool):
+            size.add(pool.size(), pool=name)
+            checked_out.add(pool.checkedout(), pool=name)
+            checked_in.add(pool.checkedin(), pool=name)
+            overflow.add(max(pool.overflow(), 0), pool=name)
+        stats = getattr(pool, "stats", None) or PoolStats()
+        waits.add(stats.waits, pool=name)
+        wait_seconds.add(stats.wait_seconds, pool=name)
+        max_wait.add(stats.max_wait_seconds, pool=name)
+        timeouts.add(stats.timeouts, pool=name)
+
+    return [size, checked_out, checked_in, overflow, waits, wait_seconds, max_wait, timeouts]
+
+
+# Upper bounds, in seconds, of the request latency histogram buckets.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class _LatencyHistogram:
+    __slots__ = ("buckets", "sum", "count")
+
+    def __init__(self) -> None:
+        # One slot per bucket plus +Inf; cumulated only when scraped.
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+
+_latencies: dict[tuple[str, str], _LatencyHistogram] = {}
+_responses: dict[tuple[str, str, int], int] = {}
+_in_flight = 0
+
+
+class HTTPMetricsMiddleware:
+    """Count requests and time them per route template, method and status.
+
+    Route templates such as ``/notes/{note_id}`` keep label cardinality bounded.
+    All updates happen on the event loop thread, so plain dict and integer
+    updates are safe without locks.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        global _in_flight
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        _in_flight += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            _in_flight -= 1
+            # The router stores the matched route on the shared scope.
+            route = getattr(scope.get("route"), "path", None) or UNMATCHED_ROUTE
+            method = scope["method"]
+
+            histogram = _latencies.get((method, route))
+            if histogram is None:
+                histogram = _latencies[(method, route)] = _LatencyHistogram()
+            histogram.buckets[bisect_left(LATENCY_BUCKETS, elapsed)] += 1
+            histogram.sum += elapsed
+            histogram.count += 1
+
+            key = (method, route, status_code)
+            _responses[key] = _responses.get(key, 0) + 1
+
+
+@register_collector
+def _collect_http() -> Iterable[MetricFamily]:
+    requests = MetricFamily(
+        "notable_http_requests_total", "counter", "Requests by method, route and status."
+    )
+    latency = MetricFamily(
+        "notable_http_request_duration_seconds", "histogram", "Request latency by route."
+    )
+    in_flight = MetricFamily("notable_http_requests_in_flight", "gauge", "Requests being served.")
+
+    for (method, route, status_code), count in list(_responses.items()):
+        requests.add(count, method=method, route=route, status=str(status_code))
+    for (method, route), histogram in list(_latencies.items()):
+        cumulative = 0
+        for bound, count in zip((*LATENCY_BUCKETS, float("inf")), histogram.buckets):
+            cumulative += count
+            latency.add(cumulative, "_bucket", method=method, route=route, le=_format_value(bound))
+        latency.add(histogram.sum, "_sum", method=method, route=route)
+        latency.add(histogram.count, "_count", method=method, route=route)
+    in_flight.add(_in_flight)
+    return [requests, latency, in_flight]
+
+
+@register_collector
+def _collect_threadpool() -> Iterable[MetricFamily]:
+    try:
+        limiter = current_default_thread_limiter()
+    except RuntimeError:
+        # Not scraped from the event loop; there is no limiter to read.
+        return []
+
+    total = MetricFamily(
+        "notable_threadpool_tokens", "gauge", "Worker threads available to run_in_threadpool."
+    )
+    busy = MetricFamily("notable_threadpool_busy", "gauge", "Worker threads currently in use.")
+    waiting = MetricFamily(
+        "notable_threadpool_waiting", "gauge", "Calls queued for a free worker thread."
+    )
+    total.add(limiter.total_tokens)
+    busy.add(limiter.borrowed_tokens)
+    waiting.add(limiter.statistics().tasks_waiting)
+    return [total, busy, waiting]
@@ -3,9 +3,12 @@ from __future__ import annotations
 import uuid
 
 from sqlalchemy import (
+    BigInteger,
+    Boolean,
     Column,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
@@ -13,8 +16,8 @@ from sqlalchemy import (
     func,
     text,
 )
-from sqlalchemy.dialects.postgresql import JSONB, UUID
-from sqlalchemy.orm import declarative_base, relationship
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR, UUID
+from sqlalchemy.orm import declarative_base, deferred, relationship
 
 Base = declarative_base()
 
@@ -37,15 +40,32 @@ class User(Base):
 
 class Note(Base):
     __tablename__ = "notes"
+    __table_args__ = (
+        Index("ix_notes_order", "order_index", "created_at", "id"),
+        Index("ix_notes_user_order", "user_id", "order_index", "created_at", "id"),
+        Index("ix_notes_parent_order", "parent_id", "order_index", "created_at", "id"),
+        Index("ix_notes_type_order", "type", "order_index", "created_at", "id"),
+        Index("ix_notes_path", "path", postgresql_ops={"path": "text_pattern_ops"}),
+        Index("ix_notes_search_vector", "search_vector", postgresql_using="gin"),
+        Index(
+            "ix_notes_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
     title = Column(String(255), nullable=False)
     slug = Column(String(255), unique=True, nullable=False)
     parent_id = Column(UUID(as_uuid=True), ForeignKey("notes.id", ondelete="SET NULL"), nullable=True)
-    order_index = Column(Integer, nullable=False, server_default=text("0"))
+    order_index = Column(BigInteger, nullable=False, server_default=text("0"))
+    path = Column(Text, nullable=False)
     metadata = Column(JSONB, server_default=text("'{}'::jsonb"), nullable=False)
     type = Column(String(50), nullable=False)
+    # Maintained by database triggers from the title and latest content version.
+    search_vector = deferred(Column(TSVECTOR, nullable=True))
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
@@ -67,6 +87,10 @@ class NoteContent(Base):
     version = Column(Integer, primary_key=True)
     tiptap_json = Column(JSONB, nullable=True)
     markdown = Column(Text, nullable=True)
+    # Delta rows hold patches from the next version back to this one instead of a snapshot.
+    is_delta = Column(Boolean, nullable=False, server_default=text("false"))
+    tiptap_patch = Column(JSONB, nullable=True)
+    markdown_patch = Column(JSONB, nullable=True)
     updated_at = Column(
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
     )
@@ -77,14 +101,17 @@ class NoteContent(Base):
 class Tag(Base):
     __tablename__ = "tags"
     __table_args__ = (
-        UniqueConstraint("user_id", "name", name="uq_user_tag_name"),
-        UniqueConstraint("user_id", "slug", name="uq_user_tag_slug"),
+        # NULLS NOT DISTINCT so shared (user-less) tags are unique too.
+        UniqueConstraint("user_id", "name", name="uq_user_tag_name", postgresql_nulls_not_distinct=True),
+        UniqueConstraint("user_id", "slug", name="uq_user_tag_slug", postgresql_nulls_not_distinct=True),
     )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=True)
     name = Column(String(100), nullable=False)
     slug = Column(String(150), nullable=False)
+    # Maintained by statement-level triggers on note_tags.
+    note_count = Column(Integer, nullable=False, server_default=text("0"))
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
@@ -96,7 +123,10 @@ class Tag(Base):
 
 class NoteTag(Base):
     __tablename__ = "note_tags"
-    __table_args__ = (UniqueConstraint("note_id", "tag_id", name="uq_note_tag"),)
+    __table_args__ = (
+        UniqueConstraint("note_id", "tag_id", name="uq_note_tag"),
+        Index("ix_note_tags_tag_note", "tag_id", "note_id"),
+    )
 
     note_id = Column(UUID(as_uuid=True), ForeignKey("notes.id", ondelete="CASCADE"), primary_key=True)
     tag_id = Column(UUID(as_uuid=True), ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True)
@@ -105,20 +135,44 @@ class NoteTag(Base):
     tag = relationship("Tag", back_populates="note_tags")
 
 
+class Blob(Base):
+    """Stored object shared by every asset with the same content.
+
+    ``ref_count`` is kept in step with ``assets`` by a database trigger, so it is
+    also correct for rows removed by ``ON DELETE CASCADE``.
+    """
+
+    __tablename__ = "blobs"
+    __table_args__ = (Index("ix_blobs_unreferenced", "sha256", postgresql_where=text("ref_count = 0")),)
+
+    sha256 = Column(String(64), primary_key=True)
+    s3_key = Column(String(500), nullable=False)
+    size = Column(BigInteger, nullable=False)
+    mime = Column(String(100), nullable=True)
+    ref_count = Column(Integer, nullable=False, server_default=text("0"))
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
 class Asset(Base):
     __tablename__ = "assets"
+    __table_args__ = (
+        Index("ix_assets_note_id", "note_id"),
+        Index("ix_assets_blob_sha256", "blob_sha256"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     note_id = Column(UUID(as_uuid=True), ForeignKey("notes.id", ondelete="CASCADE"), nullable=False)
+    blob_sha256 = Column(String(64), ForeignKey("blobs.sha256"), nullable=True)
     s3_key = Column(String(500), nullable=False)
     mime = Column(String(100), nullable=True)
-    size = Column(Integer, nullable=True)
+    size = Column(BigInteger, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
     )
 
     note = relationship("Note", back_populates="assets")
+    blob = relationship("Blob")
 
 
 class Setting(Base):
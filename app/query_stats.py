@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .config import get_settings
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+_START_KEY = "notable_query_start"
+
+
+class QueryStats:
+    """Queries run on behalf of one request, accumulated by the engine listeners."""
+
+    __slots__ = ("count", "seconds", "slowest_seconds", "slowest_statement")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.seconds = 0.0
+        self.slowest_seconds = 0.0
+        self.slowest_statement: str | None = None
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+        if seconds > self.slowest_seconds:
+            self.slowest_seconds = seconds
+            self.slowest_statement = statement
+
+    def server_timing(self) -> str:
+        """``Server-Timing`` entries for the database work."""
+
+        entries = [f'db;dur={self.seconds * 1000:.2f};desc="{self.count} queries"']
+        if self.count:
+            entries.append(f"db-slowest;dur={self.slowest_seconds * 1000:.2f}")
+        return ", ".join(entries)
+
+
+# Holds a mutable QueryStats; the threadpool and asyncpg's greenlets both copy the
+# context, so queries run there still land on the request's object.
+_current: ContextVar[QueryStats | None] = ContextVar("notable_query_stats", default=None)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Collect stats for every query issued inside the block."""
+
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:  # type: ignore[no-untyped-def]
+    conn.info.setdefault(_START_KEY, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:  # type: ignore[no-untyped-def]
+    starts = conn.info.get(_START_KEY)
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+
+    threshold = settings.db_slow_query_ms
+    if threshold is not None and elapsed * 1000 >= threshold:
+        logger.warning(
+            "Slow query (%.2fms): %s; parameters: %r", elapsed * 1000, statement, parameters
+        )
+
+
+def _handle_error(context: Any) -> None:
+    # A failed statement never reaches after_cursor_execute; drop its start time.
+    starts = context.connection.info.get(_START_KEY) if context.connection is not None else None
+    if starts:
+        starts.pop()
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Time every statement ``engine`` executes; pass ``sync_engine`` for async engines."""
+
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+def format_slowest(stats: QueryStats, limit: int = 120) -> str:
+    """One-line, truncated form of the slowest statement for log lines."""
+
+    if not stats.slowest_statement:
+        return "-"
+    statement = " ".join(stats.slowest_statement.split())
+    return statement if len(statement) <= limit else statement[: limit - 3] + "..."
@@ -0,0 +1,510 @@
+from __future__ import annotations
+
+import base64
+import logging
+import math
+import uuid
+from datetime import datetime
+from typing import AsyncIterator, BinaryIO, Dict, Iterator, List, Literal
+from uuid import UUID
+
+import anyio
+from botocore.exceptions import ClientError
+from botocore.response import StreamingBody
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import FileResponse, StreamingResponse
+from pydantic import BaseModel, Field
+from sqlalchemy import exists, or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import iterate_in_threadpool
+from starlette.types import Message, Receive, Scope, Send
+
+from app import asset_cache, storage
+from app.asset_cache import AssetCache, open_asset_cache
+from app.blobs import collect_unreferenced_blobs
+from app.config import get_settings
+from app.dependencies import get_db, get_read_db
+from app.models import Asset, Blob, Note
+
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/notes", tags=["assets"])
+download_router = APIRouter(prefix="/assets", tags=["assets"])
+
+settings = get_settings()
+
+# S3 rejects multipart uploads with more parts than this.
+MAX_UPLOAD_PARTS = 10_000
+
+STREAM_CHUNK_SIZE = 256 * 1024
+
+SHA256_PATTERN = r"^[0-9a-f]{64}$"
+
+
+class UploadRequest(BaseModel):
+    size: int = Field(ge=1)
+    mime: str | None = Field(default=None, max_length=100)
+    sha256: str | None = Field(default=None, pattern=SHA256_PATTERN)
+
+
+class AssetRead(BaseModel):
+    id: UUID
+    note_id: UUID
+    blob_sha256: str | None
+    s3_key: str
+    mime: str | None
+    size: int | None
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class UploadPart(BaseModel):
+    part_number: int
+    url: str
+
+
+class UploadTicket(BaseModel):
+    asset_id: UUID
+    method: Literal["put", "multipart", "existing"]
+    key: str | None = None
+    expires_in: int | None = None
+    url: str | None = None
+    headers: Dict[str, str] = Field(default_factory=dict)
+    upload_id: str | None = None
+    part_size: int | None = None
+    parts: List[UploadPart] = Field(default_factory=list)
+    asset: AssetRead | None = None
+
+
+class CompletedPart(BaseModel):
+    part_number: int = Field(ge=1, le=MAX_UPLOAD_PARTS)
+    etag: str
+
+
+class UploadComplete(BaseModel):
+    sha256: str | None = Field(default=None, pattern=SHA256_PATTERN)
+    upload_id: str | None = None
+    parts: List[CompletedPart] = Field(default_factory=list)
+
+
+def _staging_key(note_id: UUID, asset_id: UUID) -> str:
+    return f"uploads/{note_id}/{asset_id}"
+
+
+def _checksum(sha256: str) -> str:
+    """Hex digest to the base64 form S3 uses for ``ChecksumSHA256``."""
+
+    return base64.b64encode(bytes.fromhex(sha256)).decode()
+
+
+def _too_large() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+        detail=f"Assets are limited to {settings.asset_max_bytes} bytes",
+    )
+
+
+def _upload_missing() -> HTTPException:
+    return HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Upload not found or expired")
+
+
+async def _assert_note_exists(db: AsyncSession, note_id: UUID) -> None:
+    exists = (await db.execute(select(Note.id).where(Note.id == note_id))).scalar_one_or_none()
+    if not exists:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Note not found")
+
+
+def _storage_error(exc: ClientError) -> HTTPException:
+    code = exc.response.get("Error", {}).get("Code", "Unknown")
+    if storage.is_not_found(exc):
+        return _upload_missing()
+    return HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=f"Object storage error: {code}")
+
+
+async def _lock_blob(
+    db: AsyncSession, sha256: str, size: int, mime: str | None
+) -> Blob:
+    """Insert the blob row if needed and lock it so garbage collection skips it."""
+
+    await db.execute(
+        pg_insert(Blob)
+        .values(sha256=sha256, s3_key=storage.blob_key(sha256), size=size, mime=mime)
+        .on_conflict_do_nothing(index_elements=[Blob.sha256])
+    )
+    return (
+        await db.execute(select(Blob).where(Blob.sha256 == sha256).with_for_update())
+    ).scalar_one()
+
+
+async def _owner_references_blob(db: AsyncSession, note_id: UUID, sha256: str) -> bool:
+    """Whether an asset of ``note_id``'s owner (or of the note itself) uses the blob."""
+
+    owner_id = select(Note.user_id).where(Note.id == note_id).scalar_subquery()
+    return (
+        await db.execute(
+            select(
+                exists().where(
+                    Asset.blob_sha256 == sha256,
+                    Asset.note_id == Note.id,
+                    or_(Note.id == note_id, Note.user_id == owner_id),
+                )
+            )
+        )
+    ).scalar_one()
+
+
+async def _record_asset(
+    db: AsyncSession, asset_id: UUID, note_id: UUID, blob: Blob, mime: str | None
+) -> Asset:
+    asset = Asset(
+        id=asset_id,
+        note_id=note_id,
+        blob_sha256=blob.sha256,
+        s3_key=blob.s3_key,
+        mime=mime,
+        size=blob.size,
+    )
+    db.add(asset)
+    try:
+        await db.commit()
+    except IntegrityError as exc:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail="Asset already recorded; retry the upload"
+        ) from exc
+    await db.refresh(asset)
+    return asset
+
+
+async def _delete_object_task(key: str) -> None:
+    try:
+        await storage.delete_object(key)
+    except ClientError:
+        logger.warning("Could not delete object %s", key)
+
+
+@router.get("/{note_id}/assets", response_model=List[AssetRead])
+async def list_assets(note_id: UUID, db: AsyncSession = Depends(get_read_db)):
+    await _assert_note_exists(db, note_id)
+    result = await db.execute(
+        select(Asset).where(Asset.note_id == note_id).order_by(Asset.created_at, Asset.id)
+    )
+    return result.scalars().all()
+
+
+@router.post(
+    "/{note_id}/assets/uploads", response_model=UploadTicket, status_code=status.HTTP_201_CREATED
+)
+async def create_upload(
+    note_id: UUID, payload: UploadRequest, db: AsyncSession = Depends(get_db)
+):
+    """Hand out presigned URLs so the client uploads straight to object storage.
+
+    When ``sha256`` names content already attached to one of the note owner's
+    assets, the asset is created at once and nothing is uploaded; anyone else must
+    upload the bytes, so knowing a hash never grants access to the content.
+    Otherwise small files get a single PUT URL and larger ones get one URL per
+    multipart part.
+    """
+
+    await _assert_note_exists(db, note_id)
+    if payload.size > settings.asset_max_bytes:
+        raise _too_large()
+
+    asset_id = uuid.uuid4()
+    if payload.sha256 and await _owner_references_blob(db, note_id, payload.sha256):
+        blob = await _lock_blob(db, payload.sha256, payload.size, payload.mime)
+        # Re-check under the lock: garbage collection may have removed the object.
+        try:
+            stored = await storage.head_object(blob.s3_key)
+        except ClientError as exc:
+            await db.rollback()
+            raise _storage_error(exc) from exc
+        if stored is not None and blob.size == payload.size:
+            asset = await _record_asset(db, asset_id, note_id, blob, payload.mime or blob.mime)
+            return UploadTicket(
+                asset_id=asset_id, method="existing", asset=AssetRead.model_validate(asset)
+            )
+        await db.rollback()
+
+    expires_in = settings.s3_presign_expires_seconds
+    if payload.size <= settings.asset_multipart_threshold:
+        if payload.sha256:
+            # The bucket verifies the hash, so the object can go straight to its blob key.
+            key = storage.blob_key(payload.sha256)
+            url, headers = storage.presign_put(key, payload.mime, _checksum(payload.sha256))
+        else:
+            key = _staging_key(note_id, asset_id)
+            url, headers = storage.presign_put(key, payload.mime)
+        return UploadTicket(
+            asset_id=asset_id, method="put", key=key, expires_in=expires_in, url=url, headers=headers
+        )
+
+    key = _staging_key(note_id, asset_id)
+    part_size = max(settings.asset_multipart_part_size, math.ceil(payload.size / MAX_UPLOAD_PARTS))
+    try:
+        upload_id = await storage.create_multipart_upload(key, payload.mime)
+    except ClientError as exc:
+        raise _storage_error(exc) from exc
+
+    parts = [
+        UploadPart(part_number=number, url=storage.presign_upload_part(key, upload_id, number))
+        for number in range(1, math.ceil(payload.size / part_size) + 1)
+    ]
+    return UploadTicket(
+        asset_id=asset_id,
+        method="multipart",
+        key=key,
+        expires_in=expires_in,
+        upload_id=upload_id,
+        part_size=part_size,
+        parts=parts,
+    )
+
+
+@router.post(
+    "/{note_id}/assets/uploads/{asset_id}/complete",
+    response_model=AssetRead,
+    status_code=status.HTTP_201_CREATED,
+)
+async def complete_upload(
+    note_id: UUID,
+    asset_id: UUID,
+    payload: UploadComplete,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+):
+    """Record the uploaded object as an ``Asset`` backed by its content-addressed blob.
+
+    Objects uploaded without a bucket-verified checksum (multipart uploads and
+    uploads started without ``sha256``) land under a staging key. They are hashed
+    here and moved to the blob key unless that content is already stored.
+    """
+
+    existing = await db.get(Asset, asset_id)
+    if existing:
+        if existing.note_id != note_id:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Asset id already in use")
+        response.status_code = status.HTTP_200_OK
+        return existing
+
+    await _assert_note_exists(db, note_id)
+    staged = payload.upload_id is not None or payload.sha256 is None
+    staging_key = _staging_key(note_id, asset_id)
+
+    try:
+        if payload.upload_id:
+            if not payload.parts:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST, detail="Multipart completion needs parts"
+                )
+            await storage.complete_multipart_upload(
+                staging_key, payload.upload_id, [(part.part_number, part.etag) for part in payload.parts]
+            )
+
+        if staged:
+            head = await storage.head_object(staging_key)
+            if head is None:
+                raise _upload_missing()
+            if head["ContentLength"] > settings.asset_max_bytes:
+                await storage.delete_object(staging_key)
+                raise _too_large()
+            sha256, size = await storage.sha256_object(staging_key)
+            if payload.sha256 and payload.sha256 != sha256:
+                await storage.delete_object(staging_key)
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+                    detail="Uploaded content does not match sha256",
+                )
+        else:
+            sha256 = payload.sha256  # type: ignore[assignment]
+            head = await storage.head_object(storage.blob_key(sha256), checksum=True)
+            if head is None or head.get("ChecksumSHA256") != _checksum(sha256):
+                raise _upload_missing()
+            size = head["ContentLength"]
+
+        mime = head.get("ContentType")
+        blob = await _lock_blob(db, sha256, size, mime)
+        # Re-check under the lock: garbage collection may have removed the object.
+        if await storage.head_object(blob.s3_key) is None:
+            if not staged:
+                await db.rollback()
+                raise _upload_missing()
+            await storage.copy_object(staging_key, blob.s3_key)
+        if staged:
+            await storage.delete_object(staging_key)
+    except ClientError as exc:
+        await db.rollback()
+        raise _storage_error(exc) from exc
+
+    return await _record_asset(db, asset_id, note_id, blob, mime)
+
+
+@router.delete("/{note_id}/assets/uploads/{asset_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def abort_upload(note_id: UUID, asset_id: UUID, upload_id: str = Query(...)) -> None:
+    """Abort an unfinished multipart upload so its parts stop taking up storage."""
+
+    try:
+        await storage.abort_multipart_upload(_staging_key(note_id, asset_id), upload_id)
+    except ClientError as exc:
+        if not storage.is_not_found(exc):
+            raise _storage_error(exc) from exc
+    return None
+
+
+@router.delete("/{note_id}/assets/{asset_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_asset(
+    note_id: UUID,
+    asset_id: UUID,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
+) -> None:
+    asset = await db.get(Asset, asset_id)
+    if not asset or asset.note_id != note_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Asset not found")
+
+    await db.delete(asset)
+    await db.commit()
+    if asset.blob_sha256 is None:
+        # Assets from before content addressing own their object outright.
+        background_tasks.add_task(_delete_object_task, asset.s3_key)
+    else:
+        background_tasks.add_task(collect_unreferenced_blobs)
+    return None
+
+
+def _asset_etag(asset: Asset) -> str:
+    """Strong validator for the asset's bytes: the content hash when it has one."""
+
+    if asset.blob_sha256:
+        return f'"{asset.blob_sha256}"'
+    return f'"{asset.id}-{asset.size or 0}-{int(asset.updated_at.timestamp() * 1_000_000)}"'
+
+
+def _etag_matches(header: str | None, etag: str) -> bool:
+    if not header:
+        return False
+    candidates = {candidate.strip().removeprefix("W/") for candidate in header.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+class _CachedFileResponse(FileResponse):
+    """``FileResponse`` that counts the bytes it sends for the served-bytes metric."""
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        async def counting_send(message: Message) -> None:
+            if message["type"] == "http.response.body":
+                asset_cache.bytes_served["cache"] += len(message.get("body", b""))
+            elif message["type"] == "http.response.pathsend" and self.stat_result is not None:
+                asset_cache.bytes_served["cache"] += self.stat_result.st_size
+            await send(message)
+
+        await super().__call__(scope, receive, counting_send)
+
+
+def _read_chunks(body: StreamingBody, partial: BinaryIO | None) -> Iterator[bytes]:
+    for chunk in body.iter_chunks(STREAM_CHUNK_SIZE):
+        if partial is not None:
+            partial.write(chunk)
+        yield chunk
+
+
+async def _stream_object(
+    body: StreamingBody, cache: AssetCache | None, name: str, size: int
+) -> AsyncIterator[bytes]:
+    """Relay an S3 body in chunks, filling the disk cache when ``cache`` is given."""
+
+    partial = await cache.open_partial() if cache is not None else None
+    written = 0
+    try:
+        async for chunk in iterate_in_threadpool(_read_chunks(body, partial)):
+            written += len(chunk)
+            asset_cache.bytes_served["storage"] += len(chunk)
+            yield chunk
+    finally:
+        body.close()
+        if cache is not None and partial is not None:
+            # Finish even when the client disconnected, so no partial file is left behind.
+            with anyio.CancelScope(shield=True):
+                if written == size:
+                    await cache.commit(name, partial, size)
+                else:
+                    await cache.discard(partial)
+
+
+@download_router.get("/{asset_id}")
+async def download_asset(
+    asset_id: UUID, request: Request, db: AsyncSession = Depends(get_read_db)
+):
+    """Stream an asset, honouring ``Range`` and ``If-None-Match``.
+
+    Hot objects are served from the local disk cache; misses are relayed from
+    object storage chunk by chunk and written to the cache on the way through.
+    """
+
+    asset = await db.get(Asset, asset_id)
+    if not asset:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Asset not found")
+
+    etag = _asset_etag(asset)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Accept-Ranges": "bytes"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    media_type = asset.mime or "application/octet-stream"
+    cache = await open_asset_cache()
+    if cache is not None and not cache.admits(asset.size):
+        cache = None
+    name = etag.strip('"')
+
+    if cache is not None:
+        hit = await cache.lookup(name)
+        if hit is not None:
+            path, stat_result = hit
+            return _CachedFileResponse(
+                path, stat_result=stat_result, media_type=media_type, headers=headers
+            )
+
+    byte_range = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if byte_range and (
+        "," in byte_range
+        or not byte_range.startswith("bytes=")
+        or (if_range is not None and if_range != etag)
+    ):
+        # Object storage serves a single range only; send the whole object instead.
+        byte_range = None
+
+    try:
+        obj = await storage.get_object(asset.s3_key, byte_range)
+    except ClientError as exc:
+        if exc.response.get("Error", {}).get("Code") == "InvalidRange":
+            return Response(
+                status_code=status.HTTP_416_RANGE_NOT_SATISFIABLE,
+                headers={"Content-Range": f"bytes */{asset.size or 0}"},
+            )
+        if storage.is_not_found(exc):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Asset object missing"
+            ) from exc
+        raise _storage_error(exc) from exc
+
+    size = obj["ContentLength"]
+    headers["Content-Length"] = str(size)
+    status_code = status.HTTP_200_OK
+    if obj.get("ContentRange"):
+        status_code = status.HTTP_206_PARTIAL_CONTENT
+        headers["Content-Range"] = obj["ContentRange"]
+        cache = None
+
+    return StreamingResponse(
+        _stream_object(obj["Body"], cache, name, size),
+        status_code=status_code,
+        media_type=media_type,
+        headers=headers,
+    )
@@ -0,0 +1,271 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Dict, List
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from pydantic import BaseModel
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.autosave import AutosaveBuffer, DropSave
+from app.config import get_settings
+from app.content_diff import json_apply, json_diff, text_apply, text_diff
+from app.dependencies import get_db, get_read_db, session_scope
+from app.models import Note, NoteContent
+
+
+router = APIRouter(prefix="/notes", tags=["contents"])
+
+settings = get_settings()
+
+
+class NoteContentWrite(BaseModel):
+    tiptap_json: Dict[str, Any] | None = None
+    markdown: str | None = None
+
+
+class NoteContentRead(BaseModel):
+    note_id: UUID
+    version: int
+    tiptap_json: Dict[str, Any] | None
+    markdown: str | None
+    updated_at: datetime
+
+
+class NoteVersionRead(BaseModel):
+    version: int
+    is_delta: bool
+    updated_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class NoteVersionsResponse(BaseModel):
+    items: List[NoteVersionRead]
+
+
+class AutosaveAck(BaseModel):
+    note_id: UUID
+    coalesced_saves: int
+
+
+async def _assert_note_exists(db: AsyncSession, note_id: UUID) -> None:
+    exists = (await db.execute(select(Note.id).where(Note.id == note_id))).scalar_one_or_none()
+    if not exists:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Note not found")
+
+
+def _content_not_found() -> HTTPException:
+    return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Content not found")
+
+
+async def _load_version(db: AsyncSession, note_id: UUID, version: int | None) -> NoteContentRead:
+    """Rebuild ``version`` (or the latest) from the nearest full snapshot at or above it.
+
+    Every ``content_keyframe_interval``-th version and the latest version are stored
+    in full, so at most that many delta rows are read and applied.
+    """
+
+    if version is None:
+        head = (
+            await db.execute(
+                select(NoteContent)
+                .where(NoteContent.note_id == note_id)
+                .order_by(NoteContent.version.desc())
+                .limit(1)
+            )
+        ).scalar_one_or_none()
+        if not head:
+            raise _content_not_found()
+        rows = [head]
+    else:
+        snapshot_version = (
+            select(func.min(NoteContent.version))
+            .where(
+                NoteContent.note_id == note_id,
+                NoteContent.version >= version,
+                NoteContent.is_delta.is_(False),
+            )
+            .scalar_subquery()
+        )
+        rows = (
+            (
+                await db.execute(
+                    select(NoteContent)
+                    .where(
+                        NoteContent.note_id == note_id,
+                        NoteContent.version.between(version, snapshot_version),
+                    )
+                    .order_by(NoteContent.version.desc())
+                )
+            )
+            .scalars()
+            .all()
+        )
+        if not rows or rows[-1].version != version:
+            raise _content_not_found()
+
+    tiptap_json, markdown = rows[0].tiptap_json, rows[0].markdown
+    for row in rows[1:]:
+        tiptap_json = json_apply(tiptap_json, row.tiptap_patch or [])
+        markdown = None if row.markdown_patch is None else text_apply(markdown or "", row.markdown_patch)
+
+    target = rows[-1]
+    return NoteContentRead(
+        note_id=note_id,
+        version=target.version,
+        tiptap_json=tiptap_json,
+        markdown=markdown,
+        updated_at=target.updated_at,
+    )
+
+
+async def _write_version(db: AsyncSession, note_id: UUID, payload: NoteContentWrite) -> NoteContent:
+    """Append a full head version, turning the previous head into a reverse delta.
+
+    The caller commits. An unchanged payload returns the current head untouched.
+    """
+
+    head = (
+        await db.execute(
+            select(NoteContent)
+            .where(NoteContent.note_id == note_id)
+            .order_by(NoteContent.version.desc())
+            .limit(1)
+            .with_for_update()
+        )
+    ).scalar_one_or_none()
+
+    if head and head.tiptap_json == payload.tiptap_json and head.markdown == payload.markdown:
+        return head
+
+    if head and head.version % settings.content_keyframe_interval != 0:
+        await db.execute(
+            update(NoteContent)
+            .where(NoteContent.note_id == note_id, NoteContent.version == head.version)
+            .values(
+                is_delta=True,
+                tiptap_patch=json_diff(payload.tiptap_json, head.tiptap_json),
+                markdown_patch=(
+                    None
+                    if head.markdown is None
+                    else text_diff(payload.markdown or "", head.markdown)
+                ),
+                tiptap_json=None,
+                markdown=None,
+                # Keep the original save time of the demoted version.
+                updated_at=NoteContent.updated_at,
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    content = NoteContent(
+        note_id=note_id,
+        version=head.version + 1 if head else 1,
+        tiptap_json=payload.tiptap_json,
+        markdown=payload.markdown,
+    )
+    db.add(content)
+    return content
+
+
+async def _write_autosave(note_id: UUID, payload: NoteContentWrite) -> None:
+    async with session_scope() as db:
+        try:
+            await _write_version(db, note_id, payload)
+            await db.commit()
+        except IntegrityError as exc:
+            await db.rollback()
+            # A deleted note can never take the save; anything else (e.g. a
+            # concurrent PUT taking the version number) is worth retrying.
+            note = (await db.execute(select(Note.id).where(Note.id == note_id))).scalar_one_or_none()
+            if note is None:
+                raise DropSave(f"Note {note_id} no longer exists") from exc
+            raise
+
+
+autosave_buffer: AutosaveBuffer[NoteContentWrite] = AutosaveBuffer(
+    _write_autosave,
+    window_seconds=settings.autosave_window_seconds,
+    idle_seconds=settings.autosave_idle_seconds,
+    max_bytes=settings.autosave_max_bytes,
+)
+
+
+@router.get("/{note_id}/content", response_model=NoteContentRead)
+async def read_content(
+    note_id: UUID,
+    *,
+    db: AsyncSession = Depends(get_read_db),
+    version: int | None = Query(default=None, ge=1),
+):
+    await _assert_note_exists(db, note_id)
+    if version is None and autosave_buffer.has_pending(note_id):
+        await autosave_buffer.flush_note(note_id)
+        # The flush wrote on the primary, which a replica may not have replayed yet.
+        async with session_scope() as primary:
+            return await _load_version(primary, note_id, version)
+    return await _load_version(db, note_id, version)
+
+
+@router.put("/{note_id}/content", response_model=NoteContentRead)
+async def write_content(
+    note_id: UUID, *, db: AsyncSession = Depends(get_db), payload: NoteContentWrite
+):
+    await _assert_note_exists(db, note_id)
+    # An explicit save supersedes anything still buffered by autosave.
+    await autosave_buffer.discard(note_id)
+    content = await _write_version(db, note_id, payload)
+    try:
+        await db.commit()
+    except IntegrityError as exc:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail="Concurrent content write; retry"
+        ) from exc
+    await db.refresh(content)
+    return NoteContentRead(
+        note_id=note_id,
+        version=content.version,
+        tiptap_json=content.tiptap_json,
+        markdown=content.markdown,
+        updated_at=content.updated_at,
+    )
+
+
+@router.post(
+    "/{note_id}/content/autosave",
+    response_model=AutosaveAck,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def autosave_content(
+    note_id: UUID, *, db: AsyncSession = Depends(get_db), payload: NoteContentWrite
+):
+    """Buffer an editor autosave; rapid saves are coalesced into one version."""
+
+    await _assert_note_exists(db, note_id)
+    pending = autosave_buffer.submit(note_id, payload, len(payload.model_dump_json()))
+    return AutosaveAck(note_id=note_id, coalesced_saves=pending.saves)
+
+
+@router.get("/{note_id}/versions", response_model=NoteVersionsResponse)
+async def list_versions(
+    note_id: UUID,
+    *,
+    db: AsyncSession = Depends(get_read_db),
+    limit: int = Query(default=50, ge=1, le=200),
+    before: int | None = Query(default=None, ge=1),
+):
+    await _assert_note_exists(db, note_id)
+
+    stmt = select(NoteContent.version, NoteContent.is_delta, NoteContent.updated_at).where(
+        NoteContent.note_id == note_id
+    )
+    if before is not None:
+        stmt = stmt.where(NoteContent.version < before)
+
+    rows = (await db.execute(stmt.order_by(NoteContent.version.desc()).limit(limit))).all()
+    return {"items": rows}
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import json
+import zlib
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Any, AsyncIterator
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select, exists, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.dependencies import get_read_db, read_session_scope
+from app.models import Asset, Note, NoteContent, NoteTag, Tag, User
+
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+settings = get_settings()
+
+EXPORT_FORMAT_VERSION = 1
+
+# Derived columns are rebuilt by database triggers on import, so they are not exported.
+_DERIVED_COLUMNS = {"search_vector", "note_count"}
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (UUID, Decimal)):
+        return str(value)
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _line(kind: str, data: dict[str, Any]) -> str:
+    record = {"type": kind, "data": data}
+    return json.dumps(record, default=_json_default, separators=(",", ":")) + "\n"
+
+
+def _columns(model) -> list:
+    return [column for column in model.__table__.c if column.key not in _DERIVED_COLUMNS]
+
+
+def _export_queries(user_id: UUID) -> list[tuple[str, Select]]:
+    """One query per record type, in an order an importer can replay."""
+
+    user_notes = select(Note.id).where(Note.user_id == user_id)
+    used_tags = select(NoteTag.tag_id).where(NoteTag.note_id.in_(user_notes))
+    return [
+        ("user", select(*_columns(User)).where(User.id == user_id)),
+        (
+            "tag",
+            # Shared tags attached to the user's notes travel with the workspace.
+            select(*_columns(Tag))
+            .where(or_(Tag.user_id == user_id, Tag.id.in_(used_tags)))
+            .order_by(Tag.id),
+        ),
+        # Parents sort before their children, since a path extends its parent's.
+        ("note", select(*_columns(Note)).where(Note.user_id == user_id).order_by(Note.path, Note.id)),
+        (
+            "note_content",
+            select(*_columns(NoteContent))
+            .where(NoteContent.note_id.in_(user_notes))
+            .order_by(NoteContent.note_id, NoteContent.version),
+        ),
+        (
+            "note_tag",
+            select(*_columns(NoteTag))
+            .where(NoteTag.note_id.in_(user_notes))
+            .order_by(NoteTag.note_id, NoteTag.tag_id),
+        ),
+        (
+            "asset",
+            select(*_columns(Asset))
+            .where(Asset.note_id.in_(user_notes))
+            .order_by(Asset.note_id, Asset.id),
+        ),
+    ]
+
+
+async def _export_lines(user_id: UUID) -> AsyncIterator[str]:
+    """Yield the export as batches of NDJSON lines, one batch per fetched partition."""
+
+    yield _line(
+        "export",
+        {
+            "version": EXPORT_FORMAT_VERSION,
+            "user_id": user_id,
+            "exported_at": datetime.now(timezone.utc),
+        },
+    )
+
+    counts: dict[str, int] = {}
+    async with read_session_scope() as db:
+        # Every query reads the same snapshot, so rows stay consistent with each other.
+        await db.execute(text("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY"))
+        for kind, stmt in _export_queries(user_id):
+            counts[kind] = 0
+            result = await db.stream(stmt.execution_options(yield_per=settings.export_batch_size))
+            async for rows in result.partitions(settings.export_batch_size):
+                counts[kind] += len(rows)
+                yield "".join(_line(kind, dict(row._mapping)) for row in rows)
+        await db.rollback()
+
+    # Lets a reader tell a complete export from a truncated one.
+    yield _line("end", {"counts": counts})
+
+
+async def _gzip(chunks: AsyncIterator[str]) -> AsyncIterator[bytes]:
+    compressor = zlib.compressobj(wbits=31)
+    async for chunk in chunks:
+        # Sync-flush each batch so the client receives data as it is produced.
+        yield compressor.compress(chunk.encode()) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+
+@router.get("")
+async def export_workspace(
+    user_id: UUID,
+    *,
+    gzip: bool = False,
+    db: AsyncSession = Depends(get_read_db),
+) -> StreamingResponse:
+    """Stream a user's notes, contents, tags and asset metadata as NDJSON.
+
+    Each line is ``{"type": ..., "data": {...}}``; the last line has type ``end``
+    and the row count per type. Asset bytes stay in object storage.
+    """
+
+    found = (await db.execute(select(exists().where(User.id == user_id)))).scalar_one()
+    if not found:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+
+    filename = f"notable-{user_id}.ndjson"
+    if gzip:
+        body = _gzip(_export_lines(user_id))
+        media_type = "application/gzip"
+        filename += ".gz"
+    else:
+        body = _export_lines(user_id)
+        media_type = "application/x-ndjson"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
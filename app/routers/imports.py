@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import json
+import logging
+import math
+import tempfile
+from contextlib import ExitStack, suppress
+from typing import Any, AsyncIterator
+from uuid import UUID
+
+import anyio
+from anyio.from_thread import run_sync as run_sync_from_thread
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import exists, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.dependencies import get_db
+from app.importer import ImportFailed, import_workspace
+from app.models import User
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/import", tags=["import"])
+
+# Request bodies up to this size are spooled in memory, larger ones on disk.
+SPOOL_MEMORY_BYTES = 16 * 1024 * 1024
+
+
+def _event(stage: str, **fields: Any) -> str:
+    return json.dumps({"stage": stage, **fields}, default=str, separators=(",", ":")) + "\n"
+
+
+async def _import_events(dump: tempfile.SpooledTemporaryFile, user_id: UUID | None) -> AsyncIterator[str]:
+    """Run the import in a worker thread and relay its progress as NDJSON events."""
+
+    send, receive = anyio.create_memory_object_stream[str](math.inf)
+
+    def deliver(event: str) -> None:
+        # The client may have gone away; the import carries on without an audience.
+        with suppress(anyio.BrokenResourceError):
+            send.send_nowait(event)
+
+    def report(stage: str, **fields: Any) -> None:
+        run_sync_from_thread(deliver, _event(stage, **fields))
+
+    async def run() -> None:
+        async with send:
+            try:
+                result = await run_in_threadpool(
+                    import_workspace, dump, target_user_id=user_id, progress=report
+                )
+            except ImportFailed as exc:
+                deliver(_event("error", detail=str(exc)))
+            except Exception:
+                logger.exception("Workspace import failed")
+                deliver(_event("error", detail="Import failed"))
+            else:
+                deliver(_event("done", **result))
+            finally:
+                dump.close()
+
+    # The import finishes (or rolls back on its own errors) even if the client
+    # stops listening; the worker thread is not cancelled and events are dropped.
+    async with anyio.create_task_group() as tasks:
+        tasks.start_soon(run)
+        async with receive:
+            async for event in receive:
+                yield event
+
+
+@router.post("", status_code=status.HTTP_200_OK)
+async def import_dump(
+    request: Request,
+    *,
+    user_id: UUID | None = None,
+    db: AsyncSession = Depends(get_db),
+) -> StreamingResponse:
+    """Import an NDJSON dump from ``GET /export`` sent as the raw request body.
+
+    The body may be gzipped. Without ``user_id`` the dump's user is created anew;
+    with it, everything is imported into that existing user. All rows get fresh
+    ids. The response streams ``{"stage": ...}`` events and ends with a ``done``
+    or ``error`` event; nothing is written unless it ends with ``done``. A client
+    that disconnects early does not cancel the import.
+    """
+
+    if user_id is not None:
+        found = (await db.execute(select(exists().where(User.id == user_id)))).scalar_one()
+        if not found:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    await db.close()
+
+    with ExitStack() as cleanup:
+        dump = cleanup.enter_context(tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY_BYTES))
+        async for chunk in request.stream():
+            await run_in_threadpool(dump.write, chunk)
+        dump.seek(0)
+        if not dump.read(1):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Empty import body")
+        dump.seek(0)
+
+        response = StreamingResponse(_import_events(dump, user_id), media_type="application/x-ndjson")
+        # From here the import owns the spool file and closes it when it finishes.
+        cleanup.pop_all()
+    return response
@@ -0,0 +1,16 @@
+from __future__ import annotations
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.metrics import render_metrics
+
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    """Expose runtime metrics in the Prometheus text format."""
+
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
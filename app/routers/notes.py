@@ -1,19 +1,51 @@
 from __future__ import annotations
 
+import base64
+import json
+import uuid
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Literal, Optional, Sequence, TypeVar
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status
 from pydantic import BaseModel, Field
-from sqlalchemy import func, select
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import func, literal, literal_column, or_, select, tuple_, update
+from sqlalchemy.dialects.postgresql import ARRAY, aggregate_order_by
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import joinedload
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from app.blobs import collect_unreferenced_blobs
+from app.dependencies import get_db, get_read_db
+from app.models import Note, NoteContent, NoteTag, Tag, User
+from app.serializers import fast_json
 
-from app.dependencies import get_db
-from app.models import Note, NoteTag, Tag
+router = APIRouter(prefix="/notes", tags=["notes"])
 
+# Must match the text search configuration used by the search_vector triggers.
+SEARCH_CONFIG = "english"
 
-router = APIRouter(prefix="/notes", tags=["notes"])
+# Siblings are spaced ORDER_GAP apart so a move only rewrites the moved note.
+ORDER_GAP = 1 << 16
+MIN_ORDER_GAP = 16
+
+MAX_BATCH_SIZE = 1000
+
+# asyncpg refuses statements with more bind parameters than this.
+MAX_BIND_PARAMS = 32767
+
+T = TypeVar("T")
+
+
+def _chunked(rows: Sequence[T], params_per_row: int) -> Iterator[Sequence[T]]:
+    """Split ``rows`` so each chunk stays under ``MAX_BIND_PARAMS``."""
+
+    size = MAX_BIND_PARAMS // params_per_row
+    for start in range(0, len(rows), size):
+        yield rows[start : start + size]
 
 
 class NoteBase(BaseModel):
@@ -69,14 +101,63 @@ class NoteTreeItem(NoteRead):
 NoteTreeItem.model_rebuild()
 
 
+class NoteSearchResult(NoteRead):
+    rank: float
+    snippet: str | None
+
+
+class NoteSearchResponse(BaseModel):
+    items: List[NoteSearchResult]
+
+
+class TagFacet(BaseModel):
+    tag_id: UUID
+    slug: str
+    name: str
+    count: int
+
+
 class NotesListResponse(BaseModel):
-    total: int
+    total: int | None
     items: List[NoteRead]
+    next_cursor: str | None = None
+    facets: List[TagFacet] | None = None
 
     model_config = {"from_attributes": True}
 
 
-def _serialize_note(note: Note) -> dict[str, Any]:
+class NoteBatchCreateItem(NoteCreate):
+    # ``ref`` names an item so later items can use it as ``parent_ref``.
+    ref: str | None = None
+    parent_ref: str | None = None
+
+
+class NoteBatchCreate(BaseModel):
+    items: List[NoteBatchCreateItem] = Field(min_length=1, max_length=MAX_BATCH_SIZE)
+
+
+class NoteBatchUpdateItem(NoteUpdate):
+    id: UUID
+
+
+class NoteBatchUpdate(BaseModel):
+    items: List[NoteBatchUpdateItem] = Field(min_length=1, max_length=MAX_BATCH_SIZE)
+
+
+class NoteBatchResult(BaseModel):
+    index: int
+    status: int
+    note: NoteRead | None = None
+    error: str | None = None
+
+
+class NoteBatchResponse(BaseModel):
+    items: List[NoteBatchResult]
+
+
+def _serialize_note(note: Note, tags: list[str] | None = None) -> dict[str, Any]:
+    if tags is None:
+        tags = [nt.tag.slug for nt in note.note_tags]
     return {
         "id": note.id,
         "user_id": note.user_id,
@@ -86,12 +167,136 @@ def _serialize_note(note: Note) -> dict[str, Any]:
         "order_index": note.order_index,
         "metadata": note.metadata or {},
         "type": note.type,
-        "tags": [nt.tag.slug for nt in note.note_tags],
+        "tags": tags,
         "updated_at": note.updated_at,
         "created_at": note.created_at,
     }
 
 
+def _select_note_reads():
+    """Select exactly the ``NoteRead`` columns, in field order, as plain rows.
+
+    Tags come from a correlated ``array_agg`` so each note stays one row, with no
+    ORM entities or joined ``note_tags``/``tags`` objects to hydrate.
+    """
+
+    slugs = (
+        select(func.array_agg(aggregate_order_by(Tag.slug, Tag.slug)))
+        .join(NoteTag, NoteTag.tag_id == Tag.id)
+        .where(NoteTag.note_id == Note.id)
+        .scalar_subquery()
+    )
+    tags = func.coalesce(slugs, literal_column("'{}'::varchar[]", ARRAY(Tag.slug.type)))
+    return select(
+        Note.id,
+        Note.user_id,
+        Note.title,
+        Note.slug,
+        Note.parent_id,
+        Note.order_index,
+        Note.metadata,
+        Note.type,
+        tags.label("tags"),
+        Note.updated_at,
+        Note.created_at,
+    )
+
+
+def _serialize_row(row: Row) -> dict[str, Any]:
+    """``_serialize_note`` for rows from ``_select_note_reads``."""
+
+    payload = dict(row._mapping)
+    payload["metadata"] = payload["metadata"] or {}
+    return payload
+
+
+async def _load_tag_slugs(db: AsyncSession, note_ids: list[UUID]) -> dict[UUID, list[str]]:
+    tags_by_note: dict[UUID, list[str]] = {note_id: [] for note_id in note_ids}
+    if not note_ids:
+        return tags_by_note
+
+    rows = (
+        await db.execute(
+            select(NoteTag.note_id, Tag.slug).join(NoteTag.tag).where(NoteTag.note_id.in_(note_ids))
+        )
+    ).all()
+    for note_id, slug in rows:
+        tags_by_note[note_id].append(slug)
+    return tags_by_note
+
+
+def _subtree_cte(root_id: UUID | None, max_depth: int | None, user_id: UUID | None = None):
+    """Build a recursive CTE of ``(id, depth)`` rows below ``root_id`` (or all roots).
+
+    ``user_id`` is applied to every level, so the walk never leaves that user's notes.
+    """
+
+    anchor = select(Note.id, literal(0).label("depth"))
+    if root_id:
+        anchor = anchor.where(Note.id == root_id)
+    else:
+        anchor = anchor.where(Note.parent_id.is_(None))
+    if user_id:
+        anchor = anchor.where(Note.user_id == user_id)
+    subtree = anchor.cte("subtree", recursive=True)
+
+    children = select(Note.id, (subtree.c.depth + 1).label("depth")).join(
+        subtree, Note.parent_id == subtree.c.id
+    )
+    if max_depth is not None:
+        children = children.where(subtree.c.depth < max_depth)
+    if user_id:
+        children = children.where(Note.user_id == user_id)
+    return subtree.union_all(children)
+
+
+def _encode_cursor(note: Note) -> str:
+    payload = [note.order_index, note.created_at.isoformat(), str(note.id)]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[int, datetime, UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        order_index, created_at, note_id = json.loads(raw)
+        return int(order_index), datetime.fromisoformat(created_at), UUID(note_id)
+    except (ValueError, TypeError) as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from exc
+
+
+def _apply_cursor(stmt, cursor: str | None):
+    if not cursor:
+        return stmt
+    order_index, created_at, note_id = _decode_cursor(cursor)
+    return stmt.where(
+        tuple_(Note.order_index, Note.created_at, Note.id) > tuple_(order_index, created_at, note_id)
+    )
+
+
+class _Explain(Executable, ClauseElement):
+    """``EXPLAIN (FORMAT JSON)`` wrapper around a select statement."""
+
+    inherit_cache = False
+
+    def __init__(self, statement) -> None:
+        self.statement = statement
+
+
+@compiles(_Explain, "postgresql")
+def _compile_explain(element: _Explain, compiler, **kw) -> str:
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+async def _estimate_count(db: AsyncSession, stmt) -> int:
+    """Return the planner's row estimate for ``stmt`` without executing it."""
+
+    plan = (await db.execute(_Explain(stmt))).scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
 def _apply_filters(
     stmt,
     *,
@@ -107,20 +312,54 @@ def _apply_filters(
     if note_type:
         stmt = stmt.where(Note.type == note_type)
     if tag:
-        stmt = stmt.join(Note.note_tags).join(NoteTag.tag)
+        tag_match = Tag.slug == tag
         if user_id:
-            stmt = stmt.where(Tag.user_id == user_id)
-        stmt = stmt.where(Tag.slug == tag)
+            tag_match = tag_match & (Tag.user_id == user_id)
+        stmt = stmt.where(Note.note_tags.any(NoteTag.tag.has(tag_match)))
     return stmt
 
 
-def _fetch_note(db: Session, note_id: UUID) -> Note:
+async def _tag_facets(db: AsyncSession, filters: dict[str, Any], limit: int) -> list[dict[str, Any]]:
+    """Return the most used tags among notes matching ``filters`` with their counts."""
+
+    if not any(value is not None for value in filters.values()):
+        # Unfiltered: read the trigger-maintained counts straight off the tags.
+        rows = await db.execute(
+            select(Tag.id, Tag.slug, Tag.name, Tag.note_count)
+            .where(Tag.note_count > 0)
+            .order_by(Tag.note_count.desc(), Tag.slug)
+            .limit(limit)
+        )
+    else:
+        matching = _apply_filters(select(Note.id), **filters).subquery()
+        count = func.count().label("count")
+        rows = await db.execute(
+            select(Tag.id, Tag.slug, Tag.name, count)
+            .join(NoteTag, NoteTag.tag_id == Tag.id)
+            .join(matching, matching.c.id == NoteTag.note_id)
+            .group_by(Tag.id, Tag.slug, Tag.name)
+            .order_by(count.desc(), Tag.slug)
+            .limit(limit)
+        )
+    return [
+        {"tag_id": tag_id, "slug": slug, "name": name, "count": total}
+        for tag_id, slug, name, total in rows
+    ]
+
+
+async def _fetch_note(db: AsyncSession, note_id: UUID, *, refresh: bool = False) -> Note:
+    """Load a note with its tags; ``refresh`` reloads one already in the session."""
+
     note = (
-        db.execute(
-            select(Note)
-            .options(joinedload(Note.note_tags).joinedload(NoteTag.tag))
-            .where(Note.id == note_id)
+        (
+            await db.execute(
+                select(Note)
+                .options(joinedload(Note.note_tags).joinedload(NoteTag.tag))
+                .where(Note.id == note_id)
+                .execution_options(populate_existing=refresh)
+            )
         )
+        .unique()
         .scalars()
         .first()
     )
@@ -129,68 +368,279 @@ def _fetch_note(db: Session, note_id: UUID) -> Note:
     return note
 
 
-def _fetch_tag(db: Session, tag_id: UUID) -> Tag:
-    tag = db.execute(select(Tag).where(Tag.id == tag_id)).scalar_one_or_none()
+async def _fetch_tag(db: AsyncSession, tag_id: UUID) -> Tag:
+    tag = (await db.execute(select(Tag).where(Tag.id == tag_id))).scalar_one_or_none()
     if not tag:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tag not found")
     return tag
 
 
-def _set_note_tags(db: Session, note: Note, tag_slugs: list[str]) -> None:
+TagKey = tuple[UUID | None, str]
+
+
+async def _resolve_tags(db: AsyncSession, wanted: set[TagKey]) -> dict[TagKey, UUID]:
+    """Map ``(user_id, slug)`` pairs to tag ids, creating the missing tags.
+
+    One SELECT finds existing tags and one ``INSERT ... ON CONFLICT DO NOTHING
+    RETURNING`` creates the rest; tags created concurrently by another request
+    are picked up by a final SELECT instead of failing on ``uq_user_tag_slug``.
+    """
+
+    if not wanted:
+        return {}
+
+    async def lookup(keys: set[TagKey]) -> dict[TagKey, UUID]:
+        found: dict[TagKey, UUID] = {}
+        # Each key binds at most a slug and a user id.
+        for chunk in _chunked(list(keys), 2):
+            user_ids = {user_id for user_id, _ in chunk if user_id is not None}
+            owner = Tag.user_id.is_(None)
+            if user_ids:
+                owner = or_(owner, Tag.user_id.in_(user_ids))
+            rows = await db.execute(
+                select(Tag.user_id, Tag.slug, Tag.id).where(
+                    Tag.slug.in_({slug for _, slug in chunk}), owner
+                )
+            )
+            found.update(
+                {(user_id, slug): tag_id for user_id, slug, tag_id in rows if (user_id, slug) in keys}
+            )
+        return found
+
+    found = await lookup(wanted)
+    missing = wanted - found.keys()
+    if missing:
+        # Sorted so concurrent requests take unique-index locks in the same order.
+        ordered = sorted(missing, key=lambda key: (str(key[0] or ""), key[1]))
+        for chunk in _chunked(ordered, 4):
+            created = await db.execute(
+                pg_insert(Tag)
+                .values(
+                    [
+                        {"id": uuid.uuid4(), "user_id": user_id, "name": slug, "slug": slug}
+                        for user_id, slug in chunk
+                    ]
+                )
+                .on_conflict_do_nothing()
+                .returning(Tag.user_id, Tag.slug, Tag.id)
+            )
+            found.update({(user_id, slug): tag_id for user_id, slug, tag_id in created})
+        missing = wanted - found.keys()
+    if missing:
+        found.update(await lookup(missing))
+        missing = wanted - found.keys()
+    if missing:
+        _, slug = next(iter(missing))
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Tag '{slug}' conflicts with an existing tag name",
+        )
+    return found
+
+
+async def _set_note_tags(db: AsyncSession, note: Note, tag_slugs: list[str]) -> None:
     normalized = {slug.strip() for slug in tag_slugs if slug.strip()}
     current = {note_tag.tag.slug: note_tag for note_tag in note.note_tags}
 
     for slug in set(current) - normalized:
         note.note_tags.remove(current[slug])
 
-    for slug in normalized - set(current):
-        tag = db.execute(
-            select(Tag).where(Tag.slug == slug, Tag.user_id == note.user_id)
-        ).scalar_one_or_none()
-        if not tag:
-            tag = Tag(name=slug, slug=slug, user_id=note.user_id)
-            db.add(tag)
-            db.flush([tag])
-        note.note_tags.append(NoteTag(tag=tag))
+    tag_ids = await _resolve_tags(db, {(note.user_id, slug) for slug in normalized - set(current)})
+    note.note_tags.extend(NoteTag(tag_id=tag_id) for tag_id in tag_ids.values())
 
 
-def _assert_not_descendant(db: Session, note: Note, new_parent_id: UUID | None) -> None:
-    if not new_parent_id:
-        return
+async def _fetch_notes(db: AsyncSession, note_ids: list[UUID]) -> dict[UUID, Note]:
+    """Load several notes with their tags in one query, reloading any already in the session."""
 
-    current_parent = (
-        db.execute(select(Note).where(Note.id == new_parent_id)).scalars().first()
-    )
-    while current_parent:
-        if current_parent.id == note.id:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Cannot move a note into its own descendant",
+    if not note_ids:
+        return {}
+    notes = (
+        (
+            await db.execute(
+                select(Note)
+                .options(joinedload(Note.note_tags).joinedload(NoteTag.tag))
+                .where(Note.id.in_(note_ids))
+                .execution_options(populate_existing=True)
             )
-        current_parent = current_parent.parent
+        )
+        .unique()
+        .scalars()
+        .all()
+    )
+    return {note.id: note for note in notes}
+
+
+def _build_path(parent: Note | None, note_id: UUID) -> str:
+    return f"{parent.path if parent else '/'}{note_id}/"
+
+
+def _assert_not_descendant(note: Note, new_parent: Note | None) -> None:
+    if new_parent and new_parent.path.startswith(note.path):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cannot move a note into its own descendant",
+        )
+
+
+async def _rewrite_descendant_paths(db: AsyncSession, note: Note, new_prefix: str) -> None:
+    """Swap ``note.path`` for ``new_prefix`` on every descendant in one UPDATE."""
+
+    await db.execute(
+        update(Note)
+        .where(Note.path.startswith(note.path), Note.id != note.id)
+        .values(
+            path=func.concat(new_prefix, func.substr(Note.path, len(note.path) + 1)),
+            # Only the location changed; keep ``onupdate`` from bumping every descendant.
+            updated_at=Note.updated_at,
+        )
+        .execution_options(synchronize_session=False)
+    )
 
 
-def _reorder_siblings(
-    db: Session, note: Note, parent_id: UUID | None, position: Optional[int]
+async def _set_parent(db: AsyncSession, note: Note, parent: Note | None) -> None:
+    new_path = _build_path(parent, note.id)
+    await _rewrite_descendant_paths(db, note, new_path)
+    note.parent_id = parent.id if parent else None
+    note.path = new_path
+
+
+def _siblings_filter(parent_id: UUID | None, exclude_id: UUID | None = None):
+    criteria = [Note.parent_id == parent_id]
+    if exclude_id:
+        criteria.append(Note.id != exclude_id)
+    return criteria
+
+
+async def _last_order_index(
+    db: AsyncSession, parent_id: UUID | None, exclude_id: UUID | None = None
+) -> int | None:
+    return (
+        await db.execute(
+            select(Note.order_index)
+            .where(*_siblings_filter(parent_id, exclude_id))
+            .order_by(Note.order_index.desc())
+            .limit(1)
+        )
+    ).scalar_one_or_none()
+
+
+async def _last_order_indexes(
+    db: AsyncSession, parent_ids: set[UUID | None]
+) -> dict[UUID | None, int]:
+    """Return the highest sibling order key under each parent in one grouped query."""
+
+    if not parent_ids:
+        return {}
+    criteria = []
+    if None in parent_ids:
+        criteria.append(Note.parent_id.is_(None))
+    if parent_ids - {None}:
+        criteria.append(Note.parent_id.in_(parent_ids - {None}))
+    rows = await db.execute(
+        select(Note.parent_id, func.max(Note.order_index))
+        .where(or_(*criteria))
+        .group_by(Note.parent_id)
+    )
+    return dict(rows.all())
+
+
+async def _rebalance_siblings(
+    db: AsyncSession, parent_id: UUID | None, exclude_id: UUID | None = None
 ) -> None:
-    siblings = (
-        db.execute(
-            select(Note)
-            .where(Note.parent_id == parent_id, Note.id != note.id)
-            .order_by(Note.order_index, Note.created_at)
+    """Respace sibling order keys ``ORDER_GAP`` apart with a single UPDATE."""
+
+    ranked = (
+        select(
+            Note.id,
+            func.row_number()
+            .over(order_by=(Note.order_index, Note.created_at, Note.id))
+            .label("rank"),
+        )
+        .where(*_siblings_filter(parent_id, exclude_id))
+        .subquery()
+    )
+    await db.execute(
+        update(Note)
+        .where(Note.id == ranked.c.id)
+        .values(order_index=ranked.c.rank * ORDER_GAP, updated_at=Note.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def _neighbour_keys(
+    db: AsyncSession, note: Note, parent_id: UUID | None, position: int
+) -> list[int]:
+    """Order keys of the siblings just before and at ``position``, ignoring ``note``."""
+
+    return list(
+        (
+            await db.execute(
+                select(Note.order_index)
+                .where(*_siblings_filter(parent_id, note.id))
+                .order_by(Note.order_index, Note.created_at, Note.id)
+                .offset(max(position - 1, 0))
+                .limit(1 if position == 0 else 2)
+            )
         )
         .scalars()
         .all()
     )
 
-    if position is None or position > len(siblings):
-        position = len(siblings)
-    position = max(position, 0)
 
-    siblings.insert(position, note)
+async def _place_note(
+    db: AsyncSession,
+    note: Note,
+    parent_id: UUID | None,
+    position: Optional[int],
+) -> None:
+    """Give ``note`` an order key at ``position`` among its siblings, touching only ``note``."""
+
+    position = None if position is None else max(position, 0)
+    neighbours: list[int] = []
+    if position is not None:
+        neighbours = await _neighbour_keys(db, note, parent_id, position)
+
+    if position is None or (position > 0 and len(neighbours) < 2):
+        last = neighbours[0] if neighbours else await _last_order_index(db, parent_id, note.id)
+        note.order_index = ORDER_GAP if last is None else last + ORDER_GAP
+        return
+    if position == 0:
+        note.order_index = neighbours[0] - ORDER_GAP if neighbours else ORDER_GAP
+        return
+
+    before, after = neighbours
+    if after - before < MIN_ORDER_GAP:
+        # The gap is nearly exhausted: respace the siblings in this transaction, so
+        # no concurrent rebalance can invalidate the midpoint. Afterwards the two
+        # neighbours sit ORDER_GAP apart.
+        await _rebalance_siblings(db, parent_id, note.id)
+        neighbours = await _neighbour_keys(db, note, parent_id, position)
+        if len(neighbours) < 2:
+            # A sibling was deleted meanwhile; the note now goes last.
+            note.order_index = (neighbours[0] if neighbours else 0) + ORDER_GAP
+            return
+        before, after = neighbours
+    note.order_index = (before + after) // 2
 
-    for index, sibling in enumerate(siblings):
-        sibling.order_index = index
+
+def _apply_note_fields(note: Note, payload: NoteUpdate) -> None:
+    """Copy the plain column changes of ``payload`` onto ``note``."""
+
+    if payload.title is not None:
+        note.title = payload.title
+    if payload.slug is not None:
+        note.slug = payload.slug
+    if payload.type is not None:
+        note.type = payload.type
+    if payload.metadata is not None:
+        note.metadata = payload.metadata
+    if payload.user_id is not None and payload.user_id != note.user_id:
+        note.user_id = payload.user_id
+        note.note_tags = [
+            nt
+            for nt in note.note_tags
+            if nt.tag.user_id is None or nt.tag.user_id == note.user_id
+        ]
 
 
 def _assert_same_scope(note: Note, tag: Tag) -> None:
@@ -202,198 +652,531 @@ def _assert_same_scope(note: Note, tag: Tag) -> None:
 
 
 @router.get("", response_model=NotesListResponse)
-def list_notes(
+async def list_notes(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     limit: int = Query(default=50, ge=1, le=100),
     offset: int = Query(default=0, ge=0),
+    cursor: str | None = None,
+    count: Literal["exact", "estimate", "none"] = "exact",
+    facets: bool = False,
+    facet_limit: int = Query(default=20, ge=1, le=100),
     title: str | None = None,
     tag: str | None = None,
     note_type: str | None = Query(default=None, alias="type"),
     user_id: UUID | None = None,
 ):
-    base_stmt = select(Note)
-    filtered_stmt = _apply_filters(
-        base_stmt, title=title, tag=tag, note_type=note_type, user_id=user_id
-    )
+    if cursor and offset:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Use either cursor or offset, not both",
+        )
 
-    total_query = _apply_filters(
-        select(func.count(func.distinct(Note.id))).select_from(Note),
-        title=title,
-        tag=tag,
-        note_type=note_type,
-        user_id=user_id,
-    )
-    total = db.execute(total_query).scalar_one()
+    filters = {"title": title, "tag": tag, "note_type": note_type, "user_id": user_id}
+    filtered_stmt = _apply_filters(_select_note_reads(), **filters)
 
-    if tag:
-        filtered_stmt = filtered_stmt.distinct(Note.id)
+    total: int | None = None
+    if count == "exact":
+        total_query = _apply_filters(select(func.count(Note.id)).select_from(Note), **filters)
+        total = (await db.execute(total_query)).scalar_one()
+    elif count == "estimate":
+        total = await _estimate_count(db, _apply_filters(select(Note.id), **filters))
 
-    notes = (
-        db.execute(
-            filtered_stmt.options(joinedload(Note.note_tags).joinedload(NoteTag.tag))
-            .order_by(Note.order_index, Note.created_at)
-            .limit(limit)
-            .offset(offset)
-        )
-        .scalars()
-        .all()
+    page_stmt = (
+        _apply_cursor(filtered_stmt, cursor)
+        .order_by(Note.order_index, Note.created_at, Note.id)
+        .limit(limit + 1)
+    )
+    if offset:
+        page_stmt = page_stmt.offset(offset)
+
+    rows = (await db.execute(page_stmt)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(rows[-1])
+
+    return fast_json(
+        {
+            "total": total,
+            "items": [_serialize_row(row) for row in rows],
+            "next_cursor": next_cursor,
+            "facets": await _tag_facets(db, filters, facet_limit) if facets else None,
+        }
     )
-
-    return {"total": total, "items": [_serialize_note(note) for note in notes]}
 
 
 @router.get("/tree", response_model=List[NoteTreeItem])
-def get_notes_tree(
+async def get_notes_tree(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
+    root_id: UUID | None = None,
+    max_depth: int | None = Query(default=None, ge=0),
     title: str | None = None,
     tag: str | None = None,
     note_type: str | None = Query(default=None, alias="type"),
     user_id: UUID | None = None,
 ):
+    if root_id:
+        await _fetch_note(db, root_id)
+
+    subtree = _subtree_cte(root_id, max_depth, user_id)
     stmt = _apply_filters(
-        select(Note), title=title, tag=tag, note_type=note_type, user_id=user_id
+        _select_note_reads().join(subtree, subtree.c.id == Note.id),
+        title=title,
+        tag=tag,
+        note_type=note_type,
+        user_id=user_id,
     )
-    if tag:
-        stmt = stmt.distinct(Note.id)
 
-    notes = (
-        db.execute(
-            stmt.options(joinedload(Note.note_tags).joinedload(NoteTag.tag)).order_by(
-                Note.order_index, Note.created_at
-            )
-        )
-        .scalars()
-        .all()
-    )
+    rows = (await db.execute(stmt.order_by(Note.order_index, Note.created_at))).all()
 
-    tree: dict[UUID, dict[str, Any]] = {note.id: {**_serialize_note(note), "children": []} for note in notes}
+    tree: dict[UUID, dict[str, Any]] = {
+        row.id: {**_serialize_row(row), "children": []} for row in rows
+    }
     roots: list[dict[str, Any]] = []
 
-    for note in notes:
-        node = tree[note.id]
-        if note.parent_id and note.parent_id in tree:
-            tree[note.parent_id]["children"].append(node)
+    for row in rows:
+        node = tree[row.id]
+        if row.parent_id and row.parent_id in tree:
+            tree[row.parent_id]["children"].append(node)
         else:
             roots.append(node)
 
-    return roots
+    return fast_json(roots)
+
+
+@router.get("/search", response_model=NoteSearchResponse)
+async def search_notes(
+    *,
+    db: AsyncSession = Depends(get_read_db),
+    q: str = Query(min_length=1),
+    limit: int = Query(default=20, ge=1, le=100),
+    offset: int = Query(default=0, ge=0),
+    note_type: str | None = Query(default=None, alias="type"),
+    user_id: UUID | None = None,
+):
+    query = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+    rank = func.ts_rank_cd(Note.search_vector, query)
+
+    ranked = (
+        _apply_filters(
+            select(Note.id, rank.label("rank")).where(Note.search_vector.bool_op("@@")(query)),
+            title=None,
+            tag=None,
+            note_type=note_type,
+            user_id=user_id,
+        )
+        .order_by(rank.desc(), Note.id)
+        .limit(limit)
+        .offset(offset)
+        .subquery()
+    )
+    # Headlines are expensive, so they are only built for the page of hits.
+    latest_markdown = (
+        select(NoteContent.markdown)
+        .where(NoteContent.note_id == Note.id)
+        .order_by(NoteContent.version.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    snippet = func.ts_headline(
+        SEARCH_CONFIG,
+        func.coalesce(latest_markdown, Note.title),
+        query,
+        "MaxFragments=2, MinWords=5, MaxWords=20",
+    )
+
+    rows = (
+        await db.execute(
+            select(Note, ranked.c.rank, snippet.label("snippet"))
+            .join(ranked, ranked.c.id == Note.id)
+            .order_by(ranked.c.rank.desc(), Note.id)
+        )
+    ).all()
+    tags_by_note = await _load_tag_slugs(db, [note.id for note, _, _ in rows])
+
+    return {
+        "items": [
+            {**_serialize_note(note, tags_by_note[note.id]), "rank": rank, "snippet": snippet}
+            for note, rank, snippet in rows
+        ]
+    }
 
 
 @router.post("", response_model=NoteRead, status_code=status.HTTP_201_CREATED)
-def create_note(*, db: Session = Depends(get_db), payload: NoteCreate):
-    if payload.parent_id:
-        _fetch_note(db, payload.parent_id)
+async def create_note(*, db: AsyncSession = Depends(get_db), payload: NoteCreate):
+    parent = await _fetch_note(db, payload.parent_id) if payload.parent_id else None
 
-    max_order = db.execute(
-        select(func.coalesce(func.max(Note.order_index), -1)).where(Note.parent_id == payload.parent_id)
-    ).scalar_one()
+    last_order = await _last_order_index(db, payload.parent_id)
+    note_id = uuid.uuid4()
     note = Note(
+        id=note_id,
         user_id=payload.user_id,
         title=payload.title,
         slug=payload.slug,
         type=payload.type,
         parent_id=payload.parent_id,
         metadata=payload.metadata,
-        order_index=max_order + 1,
+        order_index=ORDER_GAP if last_order is None else last_order + ORDER_GAP,
+        path=_build_path(parent, note_id),
+        note_tags=[],
     )
     db.add(note)
-    db.flush([note])
+    await db.flush([note])
 
     if payload.tags:
-        _set_note_tags(db, note, payload.tags)
+        await _set_note_tags(db, note, payload.tags)
 
-    db.commit()
-    db.refresh(note)
+    await db.commit()
+    note = await _fetch_note(db, note.id, refresh=True)
     return NoteRead.model_validate(_serialize_note(note))
 
 
+@router.post(":batch", response_model=NoteBatchResponse)
+async def create_notes_batch(*, db: AsyncSession = Depends(get_db), payload: NoteBatchCreate):
+    """Create many notes in one transaction with a fixed number of round trips.
+
+    Items may point at each other through ``ref``/``parent_ref``. Each item gets
+    its own result; invalid items (and items under them) are skipped while the
+    rest are created.
+    """
+
+    items = payload.items
+    results: list[NoteBatchResult | None] = [None] * len(items)
+
+    def fail(index: int, code: int, error: str) -> None:
+        results[index] = NoteBatchResult(index=index, status=code, error=error)
+
+    parent_ids = {item.parent_id for item in items if item.parent_id}
+    parent_paths: dict[UUID, str] = {}
+    if parent_ids:
+        parent_paths = dict(
+            (await db.execute(select(Note.id, Note.path).where(Note.id.in_(parent_ids)))).all()
+        )
+    user_ids = {item.user_id for item in items if item.user_id}
+    known_users: set[UUID] = set()
+    if user_ids:
+        known_users = set((await db.execute(select(User.id).where(User.id.in_(user_ids)))).scalars())
+    taken_slugs = set(
+        (await db.execute(select(Note.slug).where(Note.slug.in_({item.slug for item in items})))).scalars()
+    )
+
+    refs: dict[str, int] = {}
+    batch_slugs: set[str] = set()
+    for index, item in enumerate(items):
+        if item.slug in taken_slugs or item.slug in batch_slugs:
+            fail(index, status.HTTP_409_CONFLICT, "Slug already exists")
+        elif item.ref is not None and item.ref in refs:
+            fail(index, status.HTTP_400_BAD_REQUEST, "Duplicate ref")
+        elif item.parent_id and item.parent_ref is not None:
+            fail(index, status.HTTP_400_BAD_REQUEST, "Give parent_id or parent_ref, not both")
+        elif item.parent_id and item.parent_id not in parent_paths:
+            fail(index, status.HTTP_404_NOT_FOUND, "Parent note not found")
+        elif item.user_id and item.user_id not in known_users:
+            fail(index, status.HTTP_404_NOT_FOUND, "User not found")
+        batch_slugs.add(item.slug)
+        if item.ref is not None:
+            refs.setdefault(item.ref, index)
+
+    # Resolve paths parent-first; each pass settles every item whose parent is settled.
+    note_ids = [uuid.uuid4() for _ in items]
+    paths: dict[int, str] = {}
+    depths: dict[int, int] = {}
+    pending = [index for index in range(len(items)) if results[index] is None]
+    while pending:
+        waiting = []
+        for index in pending:
+            item = items[index]
+            if item.parent_ref is None:
+                prefix = parent_paths[item.parent_id] if item.parent_id else "/"
+                paths[index], depths[index] = f"{prefix}{note_ids[index]}/", 0
+                continue
+            parent = refs.get(item.parent_ref)
+            if parent is None:
+                fail(index, status.HTTP_400_BAD_REQUEST, "Unknown parent_ref")
+            elif results[parent] is not None:
+                fail(index, status.HTTP_424_FAILED_DEPENDENCY, "Parent item failed")
+            elif parent in paths:
+                paths[index] = f"{paths[parent]}{note_ids[index]}/"
+                depths[index] = depths[parent] + 1
+            else:
+                waiting.append(index)
+        if len(waiting) == len(pending):
+            for index in waiting:
+                fail(index, status.HTTP_400_BAD_REQUEST, "parent_ref forms a cycle")
+            break
+        pending = waiting
+
+    def parent_of(index: int) -> UUID | None:
+        item = items[index]
+        return note_ids[refs[item.parent_ref]] if item.parent_ref is not None else item.parent_id
+
+    valid = [index for index in range(len(items)) if results[index] is None]
+    last_orders = await _last_order_indexes(
+        db, {parent_of(index) for index in valid if items[index].parent_ref is None}
+    )
+    order_indexes: dict[int, int] = {}
+    for index in valid:
+        parent_id = parent_of(index)
+        last_orders[parent_id] = (last_orders.get(parent_id) or 0) + ORDER_GAP
+        order_indexes[index] = last_orders[parent_id]
+
+    # One multi-row INSERT per tree level, so every parent row exists before its children.
+    for depth in sorted({depths[index] for index in valid}):
+        level = []
+        for index in valid:
+            if depths[index] != depth or results[index] is not None:
+                continue
+            if items[index].parent_ref is not None and results[refs[items[index].parent_ref]] is not None:
+                fail(index, status.HTTP_424_FAILED_DEPENDENCY, "Parent item failed")
+                continue
+            level.append(index)
+        if not level:
+            continue
+
+        inserted = set(
+            (
+                await db.execute(
+                    pg_insert(Note.__table__)
+                    .values(
+                        [
+                            {
+                                "id": note_ids[index],
+                                "user_id": items[index].user_id,
+                                "title": items[index].title,
+                                "slug": items[index].slug,
+                                "type": items[index].type,
+                                "parent_id": parent_of(index),
+                                "metadata": items[index].metadata,
+                                "order_index": order_indexes[index],
+                                "path": paths[index],
+                            }
+                            for index in level
+                        ]
+                    )
+                    .on_conflict_do_nothing(index_elements=["slug"])
+                    .returning(Note.__table__.c.id)
+                )
+            ).scalars()
+        )
+        for index in level:
+            if note_ids[index] not in inserted:
+                fail(index, status.HTTP_409_CONFLICT, "Slug already exists")
+
+    created = [index for index in valid if results[index] is None]
+    wanted_tags = {
+        (items[index].user_id, slug.strip())
+        for index in created
+        for slug in items[index].tags
+        if slug.strip()
+    }
+    if wanted_tags:
+        tag_ids = await _resolve_tags(db, wanted_tags)
+        note_tag_rows = [
+            {"note_id": note_ids[index], "tag_id": tag_ids[(items[index].user_id, slug.strip())]}
+            for index in created
+            for slug in items[index].tags
+            if slug.strip()
+        ]
+        for chunk in _chunked(note_tag_rows, 2):
+            await db.execute(pg_insert(NoteTag.__table__).values(chunk).on_conflict_do_nothing())
+
+    await db.commit()
+
+    notes = await _fetch_notes(db, [note_ids[index] for index in created])
+    for index in created:
+        results[index] = NoteBatchResult(
+            index=index,
+            status=status.HTTP_201_CREATED,
+            note=NoteRead.model_validate(_serialize_note(notes[note_ids[index]])),
+        )
+    return {"items": results}
+
+
+@router.patch(":batch", response_model=NoteBatchResponse)
+async def update_notes_batch(
+    *,
+    db: AsyncSession = Depends(get_db),
+    payload: NoteBatchUpdate,
+):
+    """Apply many note updates in one transaction, reporting a result per item.
+
+    Notes, new parents and tags are loaded set-wise. Moves are applied one by one
+    because each rewrites the paths under the moved note; every item is flushed
+    before the next so later moves see earlier paths and order keys.
+    """
+
+    items = payload.items
+    results: list[NoteBatchResult | None] = [None] * len(items)
+
+    def fail(index: int, code: int, error: str) -> None:
+        results[index] = NoteBatchResult(index=index, status=code, error=error)
+
+    notes = await _fetch_notes(db, list({item.id for item in items}))
+    parent_ids = {item.parent_id for item in items if item.parent_id is not None}
+    parents = await _fetch_notes(db, list(parent_ids - notes.keys())) if parent_ids else {}
+    parents.update({note_id: note for note_id, note in notes.items() if note_id in parent_ids})
+
+    new_slugs = {item.slug for item in items if item.slug is not None}
+    owners: dict[str, UUID] = {}
+    if new_slugs:
+        owners = dict(
+            (await db.execute(select(Note.slug, Note.id).where(Note.slug.in_(new_slugs)))).all()
+        )
+
+    seen: set[UUID] = set()
+    for index, item in enumerate(items):
+        if item.id in seen:
+            fail(index, status.HTTP_400_BAD_REQUEST, "Note appears more than once in the batch")
+        elif item.id not in notes:
+            fail(index, status.HTTP_404_NOT_FOUND, "Note not found")
+        elif item.parent_id is not None and item.parent_id not in parents:
+            fail(index, status.HTTP_404_NOT_FOUND, "Parent note not found")
+        elif item.slug is not None and owners.setdefault(item.slug, item.id) != item.id:
+            fail(index, status.HTTP_409_CONFLICT, "Slug already exists")
+        seen.add(item.id)
+
+    for index, item in enumerate(items):
+        if results[index] is not None:
+            continue
+        note = notes[item.id]
+        if item.parent_id is not None and item.parent_id != note.parent_id:
+            parent = parents[item.parent_id]
+            # Earlier moves may have rewritten these paths with a bulk UPDATE. Both
+            # objects were flushed below, so reloading the path loses nothing.
+            await db.refresh(note, ["path"])
+            await db.refresh(parent, ["path"])
+            if parent.path.startswith(note.path):
+                fail(index, status.HTTP_400_BAD_REQUEST, "Cannot move a note into its own descendant")
+                continue
+            await _set_parent(db, note, parent)
+            await _place_note(db, note, item.parent_id, None)
+        _apply_note_fields(note, item)
+        # The session does not autoflush; later items must see this one's changes.
+        await db.flush()
+
+    tagged = [index for index, item in enumerate(items) if results[index] is None and item.tags is not None]
+    if tagged:
+        tag_ids = await _resolve_tags(
+            db,
+            {
+                (notes[items[index].id].user_id, slug.strip())
+                for index in tagged
+                for slug in items[index].tags or []
+                if slug.strip()
+            },
+        )
+        for index in tagged:
+            note = notes[items[index].id]
+            wanted = {
+                tag_ids[(note.user_id, slug.strip())] for slug in items[index].tags or [] if slug.strip()
+            }
+            note.note_tags = [nt for nt in note.note_tags if nt.tag_id in wanted]
+            current = {nt.tag_id for nt in note.note_tags}
+            note.note_tags.extend(NoteTag(tag_id=tag_id) for tag_id in wanted - current)
+
+    await db.commit()
+
+    updated = [index for index in range(len(items)) if results[index] is None]
+    notes = await _fetch_notes(db, [items[index].id for index in updated])
+    for index in updated:
+        results[index] = NoteBatchResult(
+            index=index,
+            status=status.HTTP_200_OK,
+            note=NoteRead.model_validate(_serialize_note(notes[items[index].id])),
+        )
+    return {"items": results}
+
+
 @router.get("/{note_id}", response_model=NoteRead)
-def read_note(note_id: UUID, db: Session = Depends(get_db)):
-    note = _fetch_note(db, note_id)
+async def read_note(note_id: UUID, db: AsyncSession = Depends(get_read_db)):
+    note = await _fetch_note(db, note_id)
     return NoteRead.model_validate(_serialize_note(note))
 
 
 @router.put("/{note_id}", response_model=NoteRead)
-def update_note(note_id: UUID, *, db: Session = Depends(get_db), payload: NoteUpdate):
-    note = _fetch_note(db, note_id)
+async def update_note(
+    note_id: UUID,
+    *,
+    db: AsyncSession = Depends(get_db),
+    payload: NoteUpdate,
+):
+    note = await _fetch_note(db, note_id)
 
     if payload.parent_id is not None and payload.parent_id != note.parent_id:
-        _fetch_note(db, payload.parent_id) if payload.parent_id else None
-        _assert_not_descendant(db, note, payload.parent_id)
-        note.parent_id = payload.parent_id
-        _reorder_siblings(db, note, payload.parent_id, None)
+        parent = await _fetch_note(db, payload.parent_id)
+        _assert_not_descendant(note, parent)
+        await _set_parent(db, note, parent)
+        await _place_note(db, note, payload.parent_id, None)
 
-    if payload.title is not None:
-        note.title = payload.title
-    if payload.slug is not None:
-        note.slug = payload.slug
-    if payload.type is not None:
-        note.type = payload.type
-    if payload.metadata is not None:
-        note.metadata = payload.metadata
-    if payload.user_id is not None and payload.user_id != note.user_id:
-        note.user_id = payload.user_id
-        note.note_tags = [
-            nt
-            for nt in note.note_tags
-            if nt.tag.user_id is None or nt.tag.user_id == note.user_id
-        ]
+    _apply_note_fields(note, payload)
 
     if payload.tags is not None:
-        _set_note_tags(db, note, payload.tags)
+        await _set_note_tags(db, note, payload.tags)
 
-    db.commit()
-    db.refresh(note)
+    await db.commit()
+    note = await _fetch_note(db, note.id, refresh=True)
     return NoteRead.model_validate(_serialize_note(note))
 
 
 @router.delete("/{note_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_note(note_id: UUID, db: Session = Depends(get_db)) -> None:
-    note = _fetch_note(db, note_id)
-    db.delete(note)
-    db.commit()
+async def delete_note(
+    note_id: UUID, background_tasks: BackgroundTasks, db: AsyncSession = Depends(get_db)
+) -> None:
+    note = await _fetch_note(db, note_id)
+    # Children are detached by ``ON DELETE SET NULL`` and become roots.
+    await _rewrite_descendant_paths(db, note, "/")
+    await db.delete(note)
+    await db.commit()
+    # Cascaded asset deletes drop blob reference counts; reclaim what hit zero.
+    background_tasks.add_task(collect_unreferenced_blobs)
     return None
 
 
 @router.post("/{note_id}/tags/{tag_id}", response_model=NoteRead)
-def attach_tag(note_id: UUID, tag_id: UUID, db: Session = Depends(get_db)):
-    note = _fetch_note(db, note_id)
-    tag = _fetch_tag(db, tag_id)
+async def attach_tag(note_id: UUID, tag_id: UUID, db: AsyncSession = Depends(get_db)):
+    note = await _fetch_note(db, note_id)
+    tag = await _fetch_tag(db, tag_id)
     _assert_same_scope(note, tag)
 
     existing = next((nt for nt in note.note_tags if nt.tag_id == tag.id), None)
     if not existing:
         note.note_tags.append(NoteTag(tag=tag))
-        db.commit()
-        db.refresh(note)
+        await db.commit()
+        note = await _fetch_note(db, note.id, refresh=True)
 
     return NoteRead.model_validate(_serialize_note(note))
 
 
 @router.delete("/{note_id}/tags/{tag_id}", status_code=status.HTTP_200_OK, response_model=NoteRead)
-def detach_tag(note_id: UUID, tag_id: UUID, db: Session = Depends(get_db)):
-    note = _fetch_note(db, note_id)
-    tag = _fetch_tag(db, tag_id)
+async def detach_tag(note_id: UUID, tag_id: UUID, db: AsyncSession = Depends(get_db)):
+    note = await _fetch_note(db, note_id)
+    tag = await _fetch_tag(db, tag_id)
     _assert_same_scope(note, tag)
 
     note.note_tags = [nt for nt in note.note_tags if nt.tag_id != tag.id]
-    db.commit()
-    db.refresh(note)
+    await db.commit()
+    note = await _fetch_note(db, note.id, refresh=True)
     return NoteRead.model_validate(_serialize_note(note))
 
 
 @router.post("/{note_id}/move", response_model=NoteRead)
-def move_note(note_id: UUID, *, db: Session = Depends(get_db), payload: MoveRequest):
-    note = _fetch_note(db, note_id)
-    if payload.parent_id:
-        _fetch_note(db, payload.parent_id)
-    _assert_not_descendant(db, note, payload.parent_id)
-
-    note.parent_id = payload.parent_id
-    _reorder_siblings(db, note, payload.parent_id, payload.order)
-
-    db.commit()
-    db.refresh(note)
+async def move_note(
+    note_id: UUID,
+    *,
+    db: AsyncSession = Depends(get_db),
+    payload: MoveRequest,
+):
+    note = await _fetch_note(db, note_id)
+    if payload.parent_id != note.parent_id:
+        parent = await _fetch_note(db, payload.parent_id) if payload.parent_id else None
+        _assert_not_descendant(note, parent)
+        await _set_parent(db, note, parent)
+    # A reorder among the same siblings only rewrites this note's order key.
+    await _place_note(db, note, payload.parent_id, payload.order)
+
+    await db.commit()
+    note = await _fetch_note(db, note.id, refresh=True)
     return NoteRead.model_validate(_serialize_note(note))
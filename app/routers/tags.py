@@ -2,17 +2,18 @@ from __future__ import annotations
 
 import re
 from datetime import datetime
-from typing import List
+from typing import Any, Dict, List
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from pydantic import BaseModel
 from sqlalchemy import func, select
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.dependencies import get_db
+from app.dependencies import get_db, get_read_db
 from app.models import Note, NoteTag, Tag
-from app.routers.notes import NoteRead, _serialize_note
+from app.routers.notes import NoteRead, _apply_cursor, _encode_cursor
+from app.serializers import fast_json
 
 
 router = APIRouter(prefix="/tags", tags=["tags"])
@@ -48,6 +49,55 @@ class TagListResponse(BaseModel):
     items: List[TagRead]
 
 
+class TagWithCountRead(TagRead):
+    note_count: int
+
+
+class TagCountListResponse(BaseModel):
+    total: int
+    items: List[TagWithCountRead]
+
+
+class NotePartial(BaseModel):
+    """``NoteRead`` with every field optional; only requested fields are returned."""
+
+    id: UUID | None = None
+    user_id: UUID | None = None
+    title: str | None = None
+    slug: str | None = None
+    parent_id: UUID | None = None
+    order_index: int | None = None
+    metadata: Dict[str, Any] | None = None
+    type: str | None = None
+    tags: List[str] | None = None
+    updated_at: datetime | None = None
+    created_at: datetime | None = None
+
+
+class TagNotesPage(BaseModel):
+    items: List[NotePartial]
+    next_cursor: str | None
+
+
+NOTE_FIELDS = tuple(NoteRead.model_fields)
+
+# Always selected so the keyset cursor can be built from the last row.
+_CURSOR_COLUMNS = ("order_index", "created_at", "id")
+
+
+def _parse_fields(fields: str | None) -> tuple[str, ...]:
+    if not fields:
+        return NOTE_FIELDS
+    requested = tuple(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    unknown = [name for name in requested if name not in NOTE_FIELDS]
+    if unknown or not requested:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}" if unknown else "No fields requested",
+        )
+    return requested
+
+
 _slug_pattern = re.compile(r"[^a-z0-9]+")
 
 
@@ -56,20 +106,21 @@ def _slugify(value: str) -> str:
     return cleaned or value
 
 
-def _fetch_tag(db: Session, tag_id: UUID) -> Tag:
-    tag = db.execute(select(Tag).where(Tag.id == tag_id)).scalar_one_or_none()
+async def _fetch_tag(db: AsyncSession, tag_id: UUID) -> Tag:
+    tag = (await db.execute(select(Tag).where(Tag.id == tag_id))).scalar_one_or_none()
     if not tag:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tag not found")
     return tag
 
 
-@router.get("", response_model=TagListResponse)
-def list_tags(
+@router.get("", response_model=TagListResponse | TagCountListResponse)
+async def list_tags(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     limit: int = Query(default=50, ge=1, le=100),
     offset: int = Query(default=0, ge=0),
     user_id: UUID | None = None,
+    with_counts: bool = False,
 ):
     base_query = select(Tag)
     total_query = select(func.count()).select_from(Tag)
@@ -77,28 +128,33 @@ def list_tags(
         base_query = base_query.where(Tag.user_id == user_id)
         total_query = total_query.where(Tag.user_id == user_id)
 
-    total = db.execute(total_query).scalar_one()
+    total = (await db.execute(total_query)).scalar_one()
 
     tags = (
-        db.execute(
-            base_query.order_by(Tag.name).limit(limit).offset(offset)
-        )
+        (await db.execute(base_query.order_by(Tag.name).limit(limit).offset(offset)))
         .scalars()
         .all()
     )
-    return {"total": total, "items": tags}
+    if with_counts:
+        # ``note_count`` is kept current by triggers, so no per-tag counting here.
+        return TagCountListResponse(
+            total=total, items=[TagWithCountRead.model_validate(tag) for tag in tags]
+        )
+    return TagListResponse(total=total, items=[TagRead.model_validate(tag) for tag in tags])
 
 
 @router.post("", response_model=TagRead, status_code=status.HTTP_201_CREATED)
-def create_tag(*, db: Session = Depends(get_db), payload: TagCreate):
+async def create_tag(*, db: AsyncSession = Depends(get_db), payload: TagCreate):
     slug = _slugify(payload.slug or payload.name)
     if not slug:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid slug")
 
-    existing = db.execute(
-        select(Tag).where(
-            Tag.user_id == payload.user_id,
-            (Tag.name == payload.name) | (Tag.slug == slug),
+    existing = (
+        await db.execute(
+            select(Tag).where(
+                Tag.user_id == payload.user_id,
+                (Tag.name == payload.name) | (Tag.slug == slug),
+            )
         )
     ).scalar_one_or_none()
     if existing:
@@ -106,30 +162,32 @@ def create_tag(*, db: Session = Depends(get_db), payload: TagCreate):
 
     tag = Tag(user_id=payload.user_id, name=payload.name, slug=slug)
     db.add(tag)
-    db.commit()
-    db.refresh(tag)
+    await db.commit()
+    await db.refresh(tag)
     return tag
 
 
 @router.get("/{tag_id}", response_model=TagRead)
-def read_tag(tag_id: UUID, db: Session = Depends(get_db)):
-    return _fetch_tag(db, tag_id)
+async def read_tag(tag_id: UUID, db: AsyncSession = Depends(get_read_db)):
+    return await _fetch_tag(db, tag_id)
 
 
 @router.put("/{tag_id}", response_model=TagRead)
-def update_tag(tag_id: UUID, *, db: Session = Depends(get_db), payload: TagUpdate):
-    tag = _fetch_tag(db, tag_id)
+async def update_tag(tag_id: UUID, *, db: AsyncSession = Depends(get_db), payload: TagUpdate):
+    tag = await _fetch_tag(db, tag_id)
 
     new_name = payload.name or tag.name
     new_slug = _slugify(payload.slug) if payload.slug is not None else tag.slug
     if not new_slug:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid slug")
 
-    conflict = db.execute(
-        select(Tag).where(
-            Tag.id != tag_id,
-            Tag.user_id == tag.user_id,
-            (Tag.name == new_name) | (Tag.slug == new_slug),
+    conflict = (
+        await db.execute(
+            select(Tag).where(
+                Tag.id != tag_id,
+                Tag.user_id == tag.user_id,
+                (Tag.name == new_name) | (Tag.slug == new_slug),
+            )
         )
     ).scalar_one_or_none()
     if conflict:
@@ -138,32 +196,76 @@ def update_tag(tag_id: UUID, *, db: Session = Depends(get_db), payload: TagUpdat
     tag.name = new_name
     tag.slug = new_slug
 
-    db.commit()
-    db.refresh(tag)
+    await db.commit()
+    await db.refresh(tag)
     return tag
 
 
 @router.delete("/{tag_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_tag(tag_id: UUID, db: Session = Depends(get_db)) -> None:
-    tag = _fetch_tag(db, tag_id)
-    db.delete(tag)
-    db.commit()
+async def delete_tag(tag_id: UUID, db: AsyncSession = Depends(get_db)) -> None:
+    tag = await _fetch_tag(db, tag_id)
+    await db.delete(tag)
+    await db.commit()
     return None
 
 
-@router.get("/{tag_id}/notes", response_model=List[NoteRead])
-def list_notes_by_tag(tag_id: UUID, db: Session = Depends(get_db)):
-    tag = _fetch_tag(db, tag_id)
-
-    notes = (
-        db.execute(
-            select(Note)
-            .join(Note.note_tags)
-            .options(joinedload(Note.note_tags).joinedload(NoteTag.tag))
-            .where(NoteTag.tag_id == tag.id)
-            .order_by(Note.order_index, Note.created_at)
-        )
-        .scalars()
-        .all()
+@router.get(
+    "/{tag_id}/notes", response_model=TagNotesPage, response_model_exclude_unset=True
+)
+async def list_notes_by_tag(
+    tag_id: UUID,
+    *,
+    db: AsyncSession = Depends(get_read_db),
+    limit: int = Query(default=50, ge=1, le=500),
+    cursor: str | None = None,
+    fields: str | None = Query(
+        default=None, description="Comma-separated note fields to return, e.g. id,title,slug"
+    ),
+):
+    wanted = _parse_fields(fields)
+    await _fetch_tag(db, tag_id)
+
+    # Plain column rows: no ORM entities, and tags are only loaded when asked for.
+    names = [name for name in dict.fromkeys(_CURSOR_COLUMNS + wanted) if name != "tags"]
+    columns = Note.__table__.c
+    stmt = (
+        select(*(columns[name] for name in names))
+        .join(NoteTag, NoteTag.note_id == Note.id)
+        .where(NoteTag.tag_id == tag_id)
     )
-    return [NoteRead.model_validate(_serialize_note(note)) for note in notes]
+    rows = (
+        await db.execute(
+            _apply_cursor(stmt, cursor)
+            .order_by(Note.order_index, Note.created_at, Note.id)
+            .limit(limit + 1)
+        )
+    ).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(rows[-1])
+
+    tags_by_note: dict[UUID, list[str]] = {}
+    if "tags" in wanted and rows:
+        tag_rows = await db.execute(
+            select(NoteTag.note_id, Tag.slug)
+            .join(Tag, Tag.id == NoteTag.tag_id)
+            .where(NoteTag.note_id.in_([row.id for row in rows]))
+            .order_by(NoteTag.note_id, Tag.slug)
+        )
+        for note_id, slug in tag_rows:
+            tags_by_note.setdefault(note_id, []).append(slug)
+
+    items = []
+    for row in rows:
+        values = row._mapping
+        item = {
+            name: tags_by_note.get(row.id, []) if name == "tags" else values[name]
+            for name in wanted
+        }
+        if "metadata" in item:
+            item["metadata"] = item["metadata"] or {}
+        items.append(item)
+    # Plain dicts: only the requested keys count as set for response_model_exclude_unset.
+    return fast_json({"items": items, "next_cursor": next_cursor})
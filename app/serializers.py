@@ -0,0 +1,61 @@
+"""Opt-in fast JSON rendering for large list responses.
+
+With ``FAST_JSON`` enabled and ``orjson`` installed, handlers hand their plain
+dict payloads straight to orjson, skipping ``response_model`` validation and
+FastAPI's encoder pass. Payloads must already have the response model's shape;
+the output matches what pydantic would produce (UTC datetimes end in ``Z``).
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Any
+from uuid import UUID
+
+from fastapi import Response
+
+from .config import get_settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+if settings.fast_json and orjson is None:
+    logger.warning("FAST_JSON is enabled but orjson is not installed; using the standard path")
+
+ORJSON_OPTIONS = orjson.OPT_UTC_Z if orjson is not None else 0
+
+
+def _default(value: Any) -> Any:
+    # orjson only handles exact uuid.UUID; asyncpg returns its own subclass.
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+
+def fast_json_enabled() -> bool:
+    return settings.fast_json and orjson is not None
+
+
+def fast_json(payload: Any) -> Any:
+    """Render ``payload`` with orjson when the fast path is on, else return it as is."""
+
+    if fast_json_enabled():
+        try:
+            return FastJSONResponse(payload)
+        except orjson.JSONEncodeError:
+            # e.g. trees nested deeper than orjson's recursion limit
+            logger.warning("orjson could not render the response; using the standard path")
+    return payload
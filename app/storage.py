@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import hashlib
+from functools import lru_cache
+from typing import Any
+
+import boto3
+from botocore.client import BaseClient
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from starlette.concurrency import run_in_threadpool
+
+from .config import get_settings
+
+settings = get_settings()
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def _client(endpoint_url: str) -> BaseClient:
+    return boto3.client(
+        "s3",
+        endpoint_url=endpoint_url,
+        region_name=settings.s3_region,
+        aws_access_key_id=settings.s3_access_key_id,
+        aws_secret_access_key=settings.s3_secret_access_key,
+        config=Config(signature_version="s3v4", s3={"addressing_style": "path"}),
+    )
+
+
+@lru_cache
+def get_s3_client() -> BaseClient:
+    """Client used by the API itself to talk to the bucket."""
+
+    return _client(settings.s3_endpoint_url)
+
+
+@lru_cache
+def get_presign_client() -> BaseClient:
+    """Client whose presigned URLs point at the host browsers can reach."""
+
+    return _client(settings.s3_public_endpoint_url or settings.s3_endpoint_url)
+
+
+def is_not_found(exc: ClientError) -> bool:
+    return exc.response.get("Error", {}).get("Code") in {"404", "NoSuchKey", "NoSuchUpload"}
+
+
+def blob_key(sha256: str) -> str:
+    return f"blobs/{sha256[:2]}/{sha256}"
+
+
+def presign_put(
+    key: str, mime: str | None, checksum_sha256: str | None = None
+) -> tuple[str, dict[str, str]]:
+    """Return a presigned single-request PUT URL and the headers it was signed with.
+
+    With ``checksum_sha256`` (base64) the bucket rejects a body with any other hash.
+    """
+
+    params: dict[str, Any] = {"Bucket": settings.s3_bucket, "Key": key}
+    headers: dict[str, str] = {}
+    if mime:
+        params["ContentType"] = mime
+        headers["Content-Type"] = mime
+    if checksum_sha256:
+        params["ChecksumSHA256"] = checksum_sha256
+        headers["x-amz-checksum-sha256"] = checksum_sha256
+    url = get_presign_client().generate_presigned_url(
+        "put_object", Params=params, ExpiresIn=settings.s3_presign_expires_seconds
+    )
+    return url, headers
+
+
+def presign_upload_part(key: str, upload_id: str, part_number: int) -> str:
+    return get_presign_client().generate_presigned_url(
+        "upload_part",
+        Params={
+            "Bucket": settings.s3_bucket,
+            "Key": key,
+            "UploadId": upload_id,
+            "PartNumber": part_number,
+        },
+        ExpiresIn=settings.s3_presign_expires_seconds,
+    )
+
+
+async def create_multipart_upload(key: str, mime: str | None) -> str:
+    params: dict[str, Any] = {"Bucket": settings.s3_bucket, "Key": key}
+    if mime:
+        params["ContentType"] = mime
+    response = await run_in_threadpool(get_s3_client().create_multipart_upload, **params)
+    return response["UploadId"]
+
+
+async def complete_multipart_upload(
+    key: str, upload_id: str, parts: list[tuple[int, str]]
+) -> None:
+    await run_in_threadpool(
+        get_s3_client().complete_multipart_upload,
+        Bucket=settings.s3_bucket,
+        Key=key,
+        UploadId=upload_id,
+        MultipartUpload={
+            "Parts": [{"PartNumber": number, "ETag": etag} for number, etag in sorted(parts)]
+        },
+    )
+
+
+async def abort_multipart_upload(key: str, upload_id: str) -> None:
+    await run_in_threadpool(
+        get_s3_client().abort_multipart_upload,
+        Bucket=settings.s3_bucket,
+        Key=key,
+        UploadId=upload_id,
+    )
+
+
+async def get_object(key: str, byte_range: str | None = None) -> dict[str, Any]:
+    """Start a GET and return the response; ``Body`` is an unread stream."""
+
+    params: dict[str, Any] = {"Bucket": settings.s3_bucket, "Key": key}
+    if byte_range:
+        params["Range"] = byte_range
+    return await run_in_threadpool(get_s3_client().get_object, **params)
+
+
+async def head_object(key: str, *, checksum: bool = False) -> dict[str, Any] | None:
+    """Return the object's metadata, or ``None`` when it does not exist."""
+
+    params: dict[str, Any] = {"Bucket": settings.s3_bucket, "Key": key}
+    if checksum:
+        params["ChecksumMode"] = "ENABLED"
+    try:
+        return await run_in_threadpool(get_s3_client().head_object, **params)
+    except ClientError as exc:
+        if is_not_found(exc):
+            return None
+        raise
+
+
+async def delete_object(key: str) -> None:
+    await run_in_threadpool(get_s3_client().delete_object, Bucket=settings.s3_bucket, Key=key)
+
+
+def _sha256_object(key: str) -> tuple[str, int]:
+    body = get_s3_client().get_object(Bucket=settings.s3_bucket, Key=key)["Body"]
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        for chunk in body.iter_chunks(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+            size += len(chunk)
+    finally:
+        body.close()
+    return digest.hexdigest(), size
+
+
+async def sha256_object(key: str) -> tuple[str, int]:
+    """Hash an object by streaming it; returns the hex digest and byte count."""
+
+    return await run_in_threadpool(_sha256_object, key)
+
+
+def copy_to_blob(key: str) -> tuple[str, int]:
+    """Copy an object to its content-addressed key unless that already exists.
+
+    Returns the hex digest and byte count. Blocks; used by the workspace importer.
+    """
+
+    sha256, size = _sha256_object(key)
+    client = get_s3_client()
+    try:
+        client.head_object(Bucket=settings.s3_bucket, Key=blob_key(sha256))
+    except ClientError as exc:
+        if not is_not_found(exc):
+            raise
+        client.copy({"Bucket": settings.s3_bucket, "Key": key}, settings.s3_bucket, blob_key(sha256))
+    return sha256, size
+
+
+async def copy_object(source_key: str, key: str) -> None:
+    """Server-side copy; switches to multipart copy for objects over 5 GB."""
+
+    await run_in_threadpool(
+        get_s3_client().copy,
+        {"Bucket": settings.s3_bucket, "Key": source_key},
+        settings.s3_bucket,
+        key,
+    )
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import argparse
+import json
+import timeit
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Callable, List
+
+from pydantic import TypeAdapter
+
+from app.routers.notes import NoteRead, NotesListResponse, NoteTreeItem
+from app.serializers import FastJSONResponse
+
+
+def _notes(count: int) -> list[dict[str, Any]]:
+    """Build note payloads shaped like ``_serialize_note`` output."""
+
+    now = datetime.now(timezone.utc)
+    notes = []
+    for index in range(count):
+        notes.append(
+            {
+                "id": uuid.uuid4(),
+                "user_id": uuid.uuid4(),
+                "title": f"Note {index}",
+                "slug": f"note-{index}",
+                "parent_id": None,
+                "order_index": index << 16,
+                "metadata": {"pinned": index % 7 == 0, "color": "blue"},
+                "type": "page",
+                "tags": ["work", f"project-{index % 20}"],
+                "updated_at": now,
+                "created_at": now,
+            }
+        )
+    return notes
+
+
+def _tree(notes: list[dict[str, Any]], fanout: int) -> list[dict[str, Any]]:
+    nodes = [{**note, "children": []} for note in notes]
+    for index, node in enumerate(nodes[1:], start=1):
+        parent = nodes[(index - 1) // fanout]
+        node["parent_id"] = parent["id"]
+        parent["children"].append(node)
+    return nodes[:1]
+
+
+def _standard(adapter: TypeAdapter, payload: Any) -> bytes:
+    # What response_model does: validate, dump to JSON-able data, then json.dumps.
+    content = adapter.dump_python(adapter.validate_python(payload), mode="json")
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def _per_note_validation(adapter: TypeAdapter, notes: list[dict[str, Any]]) -> bytes:
+    # The older handlers also ran NoteRead.model_validate on every note first.
+    return _standard(adapter, [NoteRead.model_validate(note) for note in notes])
+
+
+def _fast(payload: Any) -> bytes:
+    return FastJSONResponse(payload).body
+
+
+def _time(fn: Callable[[], bytes], repeat: int) -> float:
+    return min(timeit.repeat(fn, number=1, repeat=repeat)) * 1000
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Compare response_model serialization with the orjson fast path."""
+
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--notes", type=int, default=5000, help="notes per response")
+    parser.add_argument("--fanout", type=int, default=8, help="children per tree node")
+    parser.add_argument("--repeat", type=int, default=7, help="best of N runs")
+    args = parser.parse_args(argv)
+
+    notes = _notes(args.notes)
+    list_payload = {"total": len(notes), "items": notes, "next_cursor": None, "facets": None}
+    tree_payload = _tree(notes, args.fanout)
+    list_adapter = TypeAdapter(NotesListResponse)
+    tree_adapter = TypeAdapter(List[NoteTreeItem])
+    notes_adapter = TypeAdapter(List[NoteRead])
+
+    cases = [
+        ("list", lambda: _standard(list_adapter, list_payload), lambda: _fast(list_payload)),
+        ("tree", lambda: _standard(tree_adapter, tree_payload), lambda: _fast(tree_payload)),
+        (
+            "tag notes",
+            lambda: _per_note_validation(notes_adapter, notes),
+            lambda: _fast({"items": notes, "next_cursor": None}),
+        ),
+    ]
+    print(f"{args.notes} notes, best of {args.repeat}")
+    print(f"{'response':<10} {'standard ms':>12} {'orjson ms':>10} {'speedup':>8}")
+    for name, standard, fast in cases:
+        standard_ms = _time(standard, args.repeat)
+        fast_ms = _time(fast, args.repeat)
+        print(f"{name:<10} {standard_ms:>12.2f} {fast_ms:>10.2f} {standard_ms / fast_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+from typing import Any
+from uuid import UUID
+
+from app.importer import ImportFailed, import_workspace
+
+logger = logging.getLogger(__name__)
+
+
+def _report(stage: str, **fields: Any) -> None:
+    details = " ".join(f"{key}={value}" for key, value in fields.items())
+    logger.info("%s %s", stage, details)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Import a workspace dump from ``GET /export`` straight into the database."""
+
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("dump", type=Path, help="NDJSON dump, optionally gzipped")
+    parser.add_argument("--user-id", type=UUID, help="existing user to import into")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    try:
+        with args.dump.open("rb") as stream:
+            result = import_workspace(stream, target_user_id=args.user_id, progress=_report)
+    except ImportFailed as exc:
+        logger.error("Import failed: %s", exc)
+        return 1
+    logger.info("Imported into user %s", result["user_id"])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import logging
+import uuid
 
 from sqlalchemy.exc import IntegrityError
 
@@ -19,12 +20,15 @@ def seed() -> None:
         db.add(user)
         db.flush()
 
+        root_note_id = uuid.uuid4()
         root_note = Note(
+            id=root_note_id,
             user_id=user.id,
             title="Welcome to Notable",
             slug="welcome-to-notable",
             type="page",
             metadata={"pinned": True},
+            path=f"/{root_note_id}/",
         )
         db.add(root_note)
         db.flush()
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import anyio
+
+from app.asset_cache import AssetCache
+
+
+def test_cache_commits_looks_up_and_evicts(tmp_path):
+    async def exercise() -> None:
+        cache = AssetCache(tmp_path, max_bytes=10, max_object_bytes=10)
+        for name in ("a", "b"):
+            partial = await cache.open_partial()
+            partial.write(b"x" * 6)
+            await cache.commit(name, partial, 6)
+
+        assert await cache.lookup("a") is None
+        hit = await cache.lookup("b")
+        assert hit is not None and hit[1].st_size == 6
+        assert (cache.hits, cache.misses, cache.evictions) == (1, 1, 1)
+
+        partial = await cache.open_partial()
+        await cache.discard(partial)
+
+    anyio.run(exercise)
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["b"]
+
+
+def test_cache_rebuilds_index_and_drops_partials(tmp_path):
+    (tmp_path / "kept").write_bytes(b"12345")
+    (tmp_path / "leftover.part").write_bytes(b"1")
+
+    cache = AssetCache(tmp_path, max_bytes=10, max_object_bytes=10)
+
+    assert (len(cache), cache.total_bytes) == (1, 5)
+    assert not (tmp_path / "leftover.part").exists()
@@ -0,0 +1,247 @@
+"""Upload flows against a moto S3 server standing in for the bucket."""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import os
+import socket
+import uuid
+from typing import Iterator
+
+import httpx
+import pytest
+
+from app import storage
+from app.config import get_settings
+
+moto_server = pytest.importorskip("moto.server")
+
+settings = get_settings()
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture(scope="module")
+def bucket() -> Iterator[None]:
+    port = _free_port()
+    server = moto_server.ThreadedMotoServer(ip_address="127.0.0.1", port=port, verbose=False)
+    server.start()
+    endpoints = settings.s3_endpoint_url, settings.s3_public_endpoint_url
+    settings.s3_endpoint_url, settings.s3_public_endpoint_url = f"http://127.0.0.1:{port}", None
+    storage.get_s3_client.cache_clear()
+    storage.get_presign_client.cache_clear()
+    storage.get_s3_client().create_bucket(Bucket=settings.s3_bucket)
+    try:
+        yield
+    finally:
+        settings.s3_endpoint_url, settings.s3_public_endpoint_url = endpoints
+        storage.get_s3_client.cache_clear()
+        storage.get_presign_client.cache_clear()
+        server.stop()
+
+
+@pytest.fixture(autouse=True)
+def bucket_checksums(bucket, monkeypatch):
+    # moto neither verifies nor reports ChecksumSHA256; report it like S3 and MinIO do.
+    head_object = storage.head_object
+
+    async def with_checksum(key: str, *, checksum: bool = False):
+        head = await head_object(key, checksum=checksum)
+        if head is not None and checksum:
+            body = storage.get_s3_client().get_object(Bucket=settings.s3_bucket, Key=key)["Body"]
+            head["ChecksumSHA256"] = base64.b64encode(hashlib.sha256(body.read()).digest()).decode()
+        return head
+
+    monkeypatch.setattr(storage, "head_object", with_checksum)
+
+
+def _keys(prefix: str) -> list[str]:
+    listing = storage.get_s3_client().list_objects_v2(Bucket=settings.s3_bucket, Prefix=prefix)
+    return [item["Key"] for item in listing.get("Contents", [])]
+
+
+def _content(size: int = 4096) -> tuple[bytes, str]:
+    data = os.urandom(size)
+    return data, hashlib.sha256(data).hexdigest()
+
+
+def _upload(client, note_id: str, data: bytes, **fields) -> dict:
+    ticket = client.post(f"/notes/{note_id}/assets/uploads", json={"size": len(data), **fields})
+    assert ticket.status_code == 201, ticket.text
+    ticket = ticket.json()
+    if ticket["method"] == "put":
+        assert httpx.put(ticket["url"], content=data, headers=ticket["headers"]).status_code == 200
+    return ticket
+
+
+def _upload_parts(ticket: dict, data: bytes) -> list[dict]:
+    parts = []
+    for part in ticket["parts"]:
+        start = (part["part_number"] - 1) * ticket["part_size"]
+        response = httpx.put(part["url"], content=data[start : start + ticket["part_size"]])
+        assert response.status_code == 200
+        parts.append({"part_number": part["part_number"], "etag": response.headers["etag"]})
+    return parts
+
+
+def test_single_put_upload(client, make_note):
+    note = make_note(title="doc")
+    data, sha256 = _content()
+
+    ticket = _upload(client, note["id"], data, sha256=sha256, mime="image/png")
+    assert ticket["method"] == "put"
+    assert ticket["key"] == storage.blob_key(sha256)
+
+    response = client.post(
+        f"/notes/{note['id']}/assets/uploads/{ticket['asset_id']}/complete", json={"sha256": sha256}
+    )
+    assert response.status_code == 201, response.text
+    assert response.json()["blob_sha256"] == sha256
+    assert response.json()["size"] == len(data)
+
+    download = client.get(f"/assets/{ticket['asset_id']}")
+    assert download.status_code == 200
+    assert download.content == data
+
+
+def test_staged_upload_is_hashed_and_moved(client, make_note):
+    note = make_note(title="doc")
+    data, sha256 = _content()
+
+    ticket = _upload(client, note["id"], data)
+    assert ticket["key"].startswith("uploads/")
+
+    response = client.post(
+        f"/notes/{note['id']}/assets/uploads/{ticket['asset_id']}/complete", json={}
+    )
+    assert response.status_code == 201, response.text
+    assert response.json()["blob_sha256"] == sha256
+    assert _keys(ticket["key"]) == []
+    assert _keys(storage.blob_key(sha256)) == [storage.blob_key(sha256)]
+
+
+def test_complete_before_upload_is_409(client, make_note):
+    note = make_note(title="doc")
+    data, sha256 = _content()
+
+    ticket = client.post(
+        f"/notes/{note['id']}/assets/uploads", json={"size": len(data), "sha256": sha256}
+    ).json()
+    response = client.post(
+        f"/notes/{note['id']}/assets/uploads/{ticket['asset_id']}/complete", json={"sha256": sha256}
+    )
+    assert response.status_code == 409
+
+
+def test_oversized_upload_is_rejected(client, make_note, monkeypatch):
+    note = make_note(title="doc")
+    monkeypatch.setattr(settings, "asset_max_bytes", 100)
+
+    response = client.post(f"/notes/{note['id']}/assets/uploads", json={"size": 101})
+    assert response.status_code == 413
+
+
+def test_multipart_upload(client, make_note, monkeypatch):
+    monkeypatch.setattr(settings, "asset_multipart_threshold", 1000)
+    note = make_note(title="doc")
+    data, sha256 = _content()
+
+    ticket = _upload(client, note["id"], data, sha256=sha256)
+    assert ticket["method"] == "multipart"
+
+    response = client.post(
+        f"/notes/{note['id']}/assets/uploads/{ticket['asset_id']}/complete",
+        json={
+            "sha256": sha256,
+            "upload_id": ticket["upload_id"],
+            "parts": _upload_parts(ticket, data),
+        },
+    )
+    assert response.status_code == 201, response.text
+    assert response.json()["blob_sha256"] == sha256
+    assert _keys(ticket["key"]) == []
+
+
+def test_hash_mismatch_is_rejected(client, make_note, monkeypatch):
+    monkeypatch.setattr(settings, "asset_multipart_threshold", 1000)
+    note = make_note(title="doc")
+    data, _ = _content()
+    _, other_sha256 = _content()
+
+    ticket = _upload(client, note["id"], data, sha256=other_sha256)
+    response = client.post(
+        f"/notes/{note['id']}/assets/uploads/{ticket['asset_id']}/complete",
+        json={
+            "sha256": other_sha256,
+            "upload_id": ticket["upload_id"],
+            "parts": _upload_parts(ticket, data),
+        },
+    )
+    assert response.status_code == 422
+    assert _keys(ticket["key"]) == []
+    assert _keys(storage.blob_key(other_sha256)) == []
+
+
+def test_multipart_upload_can_be_aborted(client, make_note, monkeypatch):
+    monkeypatch.setattr(settings, "asset_multipart_threshold", 1000)
+    note = make_note(title="doc")
+    data, sha256 = _content()
+
+    ticket = _upload(client, note["id"], data, sha256=sha256)
+    response = client.delete(
+        f"/notes/{note['id']}/assets/uploads/{ticket['asset_id']}",
+        params={"upload_id": ticket["upload_id"]},
+    )
+    assert response.status_code == 204
+
+    uploads = storage.get_s3_client().list_multipart_uploads(
+        Bucket=settings.s3_bucket, Prefix=ticket["key"]
+    )
+    assert uploads.get("Uploads", []) == []
+
+
+def test_known_content_is_reused(client, make_note):
+    note = make_note(title="doc")
+    data, sha256 = _content()
+    ticket = _upload(client, note["id"], data, sha256=sha256)
+    response = client.post(
+        f"/notes/{note['id']}/assets/uploads/{ticket['asset_id']}/complete", json={"sha256": sha256}
+    )
+    assert response.status_code == 201, response.text
+
+    again = client.post(
+        f"/notes/{note['id']}/assets/uploads", json={"size": len(data), "sha256": sha256}
+    )
+    assert again.status_code == 201, again.text
+    assert again.json()["method"] == "existing"
+    assert again.json()["asset"]["s3_key"] == storage.blob_key(sha256)
+
+
+def test_known_content_of_another_owner_must_be_uploaded(client, db_engine, make_note):
+    owners = [str(uuid.uuid4()) for _ in range(2)]
+    with db_engine.begin() as conn:
+        for owner in owners:
+            conn.exec_driver_sql(
+                "INSERT INTO users (id, email) VALUES (%(id)s::uuid, %(email)s)",
+                {"id": owner, "email": f"{owner}@example.com"},
+            )
+    note = make_note(title="doc", user_id=owners[0])
+    data, sha256 = _content()
+    ticket = _upload(client, note["id"], data, sha256=sha256)
+    response = client.post(
+        f"/notes/{note['id']}/assets/uploads/{ticket['asset_id']}/complete", json={"sha256": sha256}
+    )
+    assert response.status_code == 201, response.text
+
+    other_note = make_note(title="doc", user_id=owners[1])
+    ticket = client.post(
+        f"/notes/{other_note['id']}/assets/uploads", json={"size": len(data), "sha256": sha256}
+    )
+    assert ticket.status_code == 201, ticket.text
+    assert ticket.json()["method"] == "put"
+    assert ticket.json()["asset"] is None
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import asyncio
+import uuid
+
+from app import autosave
+from app.autosave import AutosaveBuffer, DropSave
+
+
+def _buffer(writer) -> AutosaveBuffer[str]:
+    return AutosaveBuffer(writer, window_seconds=60, idle_seconds=60, max_bytes=1 << 20)
+
+
+def test_failed_write_is_retried_on_the_next_tick():
+    written: list[str] = []
+    attempts = 0
+
+    async def flaky(note_id, payload):
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            raise RuntimeError("database went away")
+        written.append(payload)
+
+    async def exercise():
+        buffer = _buffer(flaky)
+        buffer.idle_seconds = buffer.window_seconds = 0.1
+        note_id = uuid.uuid4()
+        buffer.submit(note_id, "draft", 5)
+        await buffer.flush_note(note_id)
+        assert written == [] and buffer.has_pending(note_id)
+
+        await buffer.start()
+        await asyncio.sleep(0.2)
+        await buffer.stop()
+        assert not buffer.has_pending(note_id)
+
+    retried = autosave.failed_writes["retried"]
+    asyncio.run(exercise())
+    assert written == ["draft"]
+    assert autosave.failed_writes["retried"] == retried + 1
+
+
+def test_newer_save_supersedes_a_failed_one():
+    written: list[str] = []
+    note_id = uuid.uuid4()
+
+    async def exercise():
+        buffer: AutosaveBuffer[str]
+
+        async def failing_once(note_id, payload):
+            if not written and payload == "old":
+                buffer.submit(note_id, "new", 3)
+                written.append("failed")
+                raise RuntimeError("conflict")
+            written.append(payload)
+
+        buffer = _buffer(failing_once)
+        buffer.submit(note_id, "old", 3)
+        await buffer.flush_note(note_id)
+        assert buffer.has_pending(note_id)
+        await buffer.flush_note(note_id)
+
+    asyncio.run(exercise())
+    assert written == ["failed", "new"]
+
+
+def test_permanent_failure_is_dropped_and_counted():
+    async def gone(note_id, payload):
+        raise DropSave("note deleted")
+
+    async def exercise():
+        buffer = _buffer(gone)
+        note_id = uuid.uuid4()
+        buffer.submit(note_id, "draft", 5)
+        await buffer.flush_note(note_id)
+        assert not buffer.has_pending(note_id)
+
+    dropped = autosave.failed_writes["dropped"]
+    asyncio.run(exercise())
+    assert autosave.failed_writes["dropped"] == dropped + 1
+
+
+def test_autosave_for_deleted_note_is_dropped(client, make_note, monkeypatch):
+    from app.routers.contents import autosave_buffer
+
+    monkeypatch.setattr(autosave_buffer, "idle_seconds", 60)
+    monkeypatch.setattr(autosave_buffer, "window_seconds", 60)
+    note = make_note(title="doc")
+    response = client.post(f"/notes/{note['id']}/content/autosave", json={"markdown": "typing"})
+    assert response.status_code == 202, response.text
+    assert client.delete(f"/notes/{note['id']}").status_code == 204
+
+    dropped = autosave.failed_writes["dropped"]
+    client.portal.call(autosave_buffer.flush_note, uuid.UUID(note["id"]))
+    assert not autosave_buffer.has_pending(uuid.UUID(note["id"]))
+    assert autosave.failed_writes["dropped"] == dropped + 1
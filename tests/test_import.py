@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import io
+import tempfile
+import uuid
+
+import anyio
+import pytest
+
+from app.importer import ImportFailed, import_workspace
+from app.routers.imports import _import_events
+
+
+def _note_count(db_engine, user_id: str) -> int:
+    with db_engine.connect() as conn:
+        return conn.exec_driver_sql(
+            "SELECT count(*) FROM notes WHERE user_id = %(id)s::uuid", {"id": user_id}
+        ).scalar_one()
+
+
+def test_import_completes_after_client_disconnects(client, db_engine, make_note):
+    user_id = str(uuid.uuid4())
+    with db_engine.begin() as conn:
+        conn.exec_driver_sql(
+            "INSERT INTO users (id, email) VALUES (%(id)s::uuid, %(email)s)",
+            {"id": user_id, "email": f"{user_id}@example.com"},
+        )
+    make_note(title="exported", user_id=user_id)
+    response = client.get("/export", params={"user_id": user_id})
+    assert response.status_code == 200, response.text
+
+    async def listen_briefly(dump) -> list[str]:
+        received = []
+        # Stop listening after the first event, as the server does when the client disconnects.
+        with anyio.CancelScope() as scope:
+            async for event in _import_events(dump, uuid.UUID(user_id)):
+                received.append(event)
+                scope.cancel()
+        return received
+
+    with tempfile.SpooledTemporaryFile() as dump:
+        dump.write(response.content)
+        dump.seek(0)
+        assert len(anyio.run(listen_briefly, dump)) == 1
+    assert _note_count(db_engine, user_id) == 2
+
+
+def test_unmappable_tag_fails_the_import_by_name(client, db_engine, make_note):
+    user_id = str(uuid.uuid4())
+    slug = f"vanishing-{uuid.uuid4().hex}"
+    with db_engine.begin() as conn:
+        conn.exec_driver_sql(
+            "INSERT INTO users (id, email) VALUES (%(id)s::uuid, %(email)s)",
+            {"id": user_id, "email": f"{user_id}@example.com"},
+        )
+    note = make_note(title="tagged", user_id=user_id)
+    tag = client.post("/tags", json={"name": slug, "slug": slug, "user_id": user_id}).json()
+    client.post(f"/notes/{note['id']}/tags/{tag['id']}")
+    dump = client.get("/export", params={"user_id": user_id}).content
+
+    with db_engine.begin() as conn:
+        conn.exec_driver_sql(
+            "UPDATE users SET email = 'old-' || email WHERE id = %(id)s::uuid", {"id": user_id}
+        )
+        # Lose the tag's insert without a conflict, as a concurrent delete would.
+        conn.exec_driver_sql(
+            "CREATE FUNCTION test_skip_tag() RETURNS trigger LANGUAGE plpgsql"
+            " AS $$ BEGIN RETURN NULL; END $$"
+        )
+        conn.exec_driver_sql(
+            "CREATE TRIGGER test_skip_tag BEFORE INSERT ON tags FOR EACH ROW"
+            f" WHEN (NEW.slug = '{slug}') EXECUTE FUNCTION test_skip_tag()"
+        )
+    try:
+        with pytest.raises(ImportFailed, match=slug):
+            import_workspace(io.BytesIO(dump))
+    finally:
+        with db_engine.begin() as conn:
+            conn.exec_driver_sql("DROP TRIGGER test_skip_tag ON tags")
+            conn.exec_driver_sql("DROP FUNCTION test_skip_tag()")
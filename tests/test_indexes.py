@@ -0,0 +1,108 @@
+"""The router queries must be able to use the indexes added in migration 0007.
+
+Sequential scans are disabled while planning, so the small test tables do not
+hide a query shape that no index can serve.
+"""
+
+from __future__ import annotations
+
+import json
+import uuid
+from typing import Any, Iterator
+
+import pytest
+from sqlalchemy import event
+
+from app.dependencies import async_engine, engine
+
+
+def _index_names(plan: Any) -> set[str]:
+    if isinstance(plan, list):
+        return set().union(*(_index_names(node) for node in plan))
+    if not isinstance(plan, dict):
+        return set()
+    names = {plan["Index Name"]} if "Index Name" in plan else set()
+    for key in ("Plan", "Plans"):
+        if key in plan:
+            names |= _index_names(plan[key])
+    return names
+
+
+@pytest.fixture
+def used_indexes(db_engine) -> Iterator[set[str]]:
+    """Collect the indexes in the plans of every SELECT the app runs meanwhile."""
+
+    target = async_engine.sync_engine if async_engine is not None else engine
+    found: set[str] = set()
+
+    def explain(conn, cursor, statement, parameters, context, executemany):
+        if executemany or not statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            return
+        cursor.execute("SET enable_seqscan = off")
+        try:
+            cursor.execute("EXPLAIN (FORMAT JSON) " + statement, parameters)
+            plan = cursor.fetchone()[0]
+        finally:
+            cursor.execute("RESET enable_seqscan")
+        found.update(_index_names(json.loads(plan) if isinstance(plan, str) else plan))
+
+    event.listen(target, "before_cursor_execute", explain)
+    yield found
+    event.remove(target, "before_cursor_execute", explain)
+
+
+@pytest.fixture
+def user_id(db_engine) -> str:
+    user_id = str(uuid.uuid4())
+    with db_engine.begin() as conn:
+        conn.exec_driver_sql(
+            "INSERT INTO users (id, email) VALUES (%(id)s::uuid, %(email)s)",
+            {"id": user_id, "email": f"{user_id}@example.com"},
+        )
+    return user_id
+
+
+@pytest.mark.parametrize(
+    ("params", "index"),
+    [
+        ({}, "ix_notes_order"),
+        ({"type": "page"}, "ix_notes_type_order"),
+    ],
+)
+def test_list_notes_uses_index(client, used_indexes, params, index):
+    response = client.get("/notes", params={"count": "none", **params})
+    assert response.status_code == 200, response.text
+    assert index in used_indexes
+
+
+def test_list_notes_by_user_uses_index(client, used_indexes, user_id):
+    response = client.get("/notes", params={"count": "none", "user_id": user_id})
+    assert response.status_code == 200, response.text
+    assert "ix_notes_user_order" in used_indexes
+
+
+def test_sibling_order_uses_index(client, make_note, used_indexes):
+    parent = make_note(title="parent")
+    make_note(title="child", parent_id=parent["id"])
+    assert "ix_notes_parent_order" in used_indexes
+
+
+def test_tag_notes_uses_index(client, make_note, used_indexes, user_id):
+    note = make_note(title="tagged", user_id=user_id)
+    tag = client.post("/tags", json={"name": f"tag-{uuid.uuid4().hex}", "user_id": user_id})
+    assert tag.status_code == 201, tag.text
+    response = client.post(f"/notes/{note['id']}/tags/{tag.json()['id']}")
+    assert response.status_code == 200, response.text
+
+    used_indexes.clear()
+    response = client.get(f"/tags/{tag.json()['id']}/notes")
+    assert response.status_code == 200, response.text
+    assert "ix_note_tags_tag_note" in used_indexes
+
+
+def test_note_assets_uses_index(client, make_note, used_indexes):
+    note = make_note(title="with assets")
+    used_indexes.clear()
+    response = client.get(f"/notes/{note['id']}/assets")
+    assert response.status_code == 200, response.text
+    assert "ix_assets_note_id" in used_indexes
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import uuid
+
+
+def _paths(db_engine, ids: list[str]) -> dict[str, str]:
+    with db_engine.connect() as conn:
+        rows = conn.exec_driver_sql(
+            "SELECT id::text, path FROM notes WHERE id = ANY(%(ids)s::uuid[])", {"ids": ids}
+        ).all()
+    return dict(rows)
+
+
+def test_batch_moves_parent_and_child(client, db_engine, make_note):
+    target = make_note(title="target")
+    parent = make_note(title="parent")
+    other = make_note(title="other")
+    child = make_note(title="child", parent_id=parent["id"])
+    grandchild = make_note(title="grandchild", parent_id=child["id"])
+
+    # Move the parent, then move a note under it, then move the parent's child.
+    response = client.patch(
+        "/notes:batch",
+        json={
+            "items": [
+                {"id": parent["id"], "parent_id": target["id"]},
+                {"id": other["id"], "parent_id": parent["id"]},
+                {"id": child["id"], "parent_id": other["id"]},
+            ]
+        },
+    )
+    assert response.status_code == 200, response.text
+    assert [item["status"] for item in response.json()["items"]] == [200, 200, 200]
+
+    ids = [target["id"], parent["id"], other["id"], child["id"], grandchild["id"]]
+    paths = _paths(db_engine, ids)
+    expected = "/" + target["id"] + "/"
+    for note_id in ids[1:]:
+        expected += note_id + "/"
+        assert paths[note_id] == expected
+
+
+def test_batch_moves_get_distinct_order_keys(client, db_engine, make_note):
+    target = make_note(title="target")
+    first = make_note(title="first")
+    second = make_note(title="second")
+
+    response = client.patch(
+        "/notes:batch",
+        json={
+            "items": [
+                {"id": first["id"], "parent_id": target["id"]},
+                {"id": second["id"], "parent_id": target["id"]},
+            ]
+        },
+    )
+    assert response.status_code == 200, response.text
+
+    orders = [item["note"]["order_index"] for item in response.json()["items"]]
+    assert orders[0] < orders[1]
+
+
+def test_batch_create_with_more_tags_than_bind_parameters(client, db_engine):
+    owner = str(uuid.uuid4())
+    with db_engine.begin() as conn:
+        conn.exec_driver_sql(
+            "INSERT INTO users (id, email) VALUES (%(id)s::uuid, %(email)s)",
+            {"id": owner, "email": f"{owner}@example.com"},
+        )
+    # 10,000 new tags (40,000 parameters as one INSERT) on 20,000 note_tags rows.
+    tags = [f"tag-{owner}-{number}" for number in range(10_000)]
+    items = [
+        {
+            "title": "tagged",
+            "slug": f"test-{uuid.uuid4().hex}",
+            "type": "page",
+            "user_id": owner,
+            "tags": tags[:5_000] if number % 2 else tags[5_000:],
+        }
+        for number in range(4)
+    ]
+
+    response = client.post("/notes:batch", json={"items": items})
+    assert response.status_code == 200, response.text
+    assert [item["status"] for item in response.json()["items"]] == [201] * 4
+
+    with db_engine.connect() as conn:
+        count = conn.exec_driver_sql(
+            "SELECT count(*) FROM note_tags nt JOIN notes n ON n.id = nt.note_id"
+            " WHERE n.user_id = %(owner)s::uuid",
+            {"owner": owner},
+        ).scalar()
+    assert count == 20_000
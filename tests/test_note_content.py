@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import uuid
+from typing import AsyncIterator
+
+import pytest
+from sqlalchemy import text
+
+from app.dependencies import get_read_db, session_scope
+from app.main import app
+from app.routers.contents import autosave_buffer
+
+
+async def _lagging_read_db() -> AsyncIterator:
+    # A snapshot taken before the request's own writes behaves like a replica
+    # that has not replayed them yet.
+    async with session_scope() as db:
+        await db.execute(text("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ"))
+        await db.execute(text("SELECT 1"))
+        yield db
+
+
+@pytest.fixture
+def lagging_replica():
+    app.dependency_overrides[get_read_db] = _lagging_read_db
+    yield
+    app.dependency_overrides.pop(get_read_db, None)
+
+
+def test_read_sees_flushed_autosave_despite_replica_lag(
+    client, make_note, lagging_replica, monkeypatch
+):
+    # Keep the save buffered until the read flushes it.
+    monkeypatch.setattr(autosave_buffer, "idle_seconds", 60)
+    monkeypatch.setattr(autosave_buffer, "window_seconds", 60)
+    note = make_note(title="doc")
+    saved = client.put(f"/notes/{note['id']}/content", json={"markdown": "saved"})
+    assert saved.status_code == 200, saved.text
+
+    response = client.post(f"/notes/{note['id']}/content/autosave", json={"markdown": "typing"})
+    assert response.status_code == 202, response.text
+    assert autosave_buffer.has_pending(uuid.UUID(note["id"]))
+
+    response = client.get(f"/notes/{note['id']}/content")
+    assert response.status_code == 200, response.text
+    assert response.json()["markdown"] == "typing"
+    assert response.json()["version"] == saved.json()["version"] + 1
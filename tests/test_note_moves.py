@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+
+def _rows(db_engine, ids: list[str]) -> dict[str, tuple]:
+    with db_engine.connect() as conn:
+        rows = conn.exec_driver_sql(
+            "SELECT id::text, path, updated_at, xmin::text FROM notes WHERE id = ANY(%(ids)s::uuid[])",
+            {"ids": ids},
+        ).all()
+    return {row[0]: row[1:] for row in rows}
+
+
+def test_reorder_leaves_descendants_untouched(client, db_engine, make_note):
+    parent = make_note(title="parent")
+    first = make_note(title="first", parent_id=parent["id"])
+    second = make_note(title="second", parent_id=parent["id"])
+    grandchild = make_note(title="grandchild", parent_id=second["id"])
+    before = _rows(db_engine, [second["id"], grandchild["id"]])
+
+    response = client.post(f"/notes/{second['id']}/move", json={"parent_id": parent["id"], "order": 0})
+    assert response.status_code == 200, response.text
+    assert response.json()["order_index"] < first["order_index"]
+
+    after = _rows(db_engine, [second["id"], grandchild["id"]])
+    assert after[grandchild["id"]] == before[grandchild["id"]]
+    assert after[second["id"]][0] == before[second["id"]][0]
+
+
+def test_move_keeps_descendant_updated_at(client, db_engine, make_note):
+    target = make_note(title="target")
+    parent = make_note(title="parent")
+    child = make_note(title="child", parent_id=parent["id"])
+    before = _rows(db_engine, [child["id"]])[child["id"]]
+
+    response = client.post(f"/notes/{parent['id']}/move", json={"parent_id": target["id"]})
+    assert response.status_code == 200, response.text
+
+    path, updated_at, _ = _rows(db_engine, [child["id"]])[child["id"]]
+    assert path == f"/{target['id']}/{parent['id']}/{child['id']}/"
+    assert updated_at == before[1]
+
+
+def test_exhausted_gap_respaces_siblings_in_place(client, db_engine, make_note):
+    parent = make_note(title="parent")
+    first = make_note(title="first", parent_id=parent["id"])
+    second = make_note(title="second", parent_id=parent["id"])
+    moved = make_note(title="moved")
+    with db_engine.begin() as conn:
+        conn.exec_driver_sql(
+            "UPDATE notes SET order_index = order_index + 1 WHERE id = %(id)s::uuid", {"id": first["id"]}
+        )
+        conn.exec_driver_sql(
+            "UPDATE notes SET order_index = %(order)s WHERE id = %(id)s::uuid",
+            {"order": first["order_index"] + 8, "id": second["id"]},
+        )
+    before = _rows(db_engine, [first["id"], second["id"]])
+
+    response = client.post(f"/notes/{moved['id']}/move", json={"parent_id": parent["id"], "order": 1})
+    assert response.status_code == 200, response.text
+
+    with db_engine.connect() as conn:
+        children = conn.exec_driver_sql(
+            "SELECT id::text FROM notes WHERE parent_id = %(id)s::uuid ORDER BY order_index",
+            {"id": parent["id"]},
+        ).scalars().all()
+    assert children == [first["id"], moved["id"], second["id"]]
+    after = _rows(db_engine, [first["id"], second["id"]])
+    assert after[second["id"]][1] == before[second["id"]][1]
+
+
+def test_rebalance_places_note_between_tight_neighbours(client, db_engine, make_note):
+    parent = make_note(title="parent")
+    siblings = [make_note(title=f"sibling {index}", parent_id=parent["id"]) for index in range(3)]
+    moved = make_note(title="moved")
+    with db_engine.begin() as conn:
+        # Keys one apart leave no room for a midpoint without respacing.
+        for index, sibling in enumerate(siblings):
+            conn.exec_driver_sql(
+                "UPDATE notes SET order_index = %(order)s WHERE id = %(id)s::uuid",
+                {"order": index, "id": sibling["id"]},
+            )
+
+    response = client.post(f"/notes/{moved['id']}/move", json={"parent_id": parent["id"], "order": 2})
+    assert response.status_code == 200, response.text
+
+    with db_engine.connect() as conn:
+        children = conn.exec_driver_sql(
+            "SELECT id::text FROM notes WHERE parent_id = %(id)s::uuid ORDER BY order_index",
+            {"id": parent["id"]},
+        ).scalars().all()
+    assert children == [siblings[0]["id"], siblings[1]["id"], moved["id"], siblings[2]["id"]]
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import uuid
+
+
+def _make_user(db_engine) -> str:
+    user_id = str(uuid.uuid4())
+    with db_engine.begin() as conn:
+        conn.exec_driver_sql(
+            "INSERT INTO users (id, email) VALUES (%(id)s::uuid, %(email)s)",
+            {"id": user_id, "email": f"{user_id}@example.com"},
+        )
+    return user_id
+
+
+def _ids(nodes: list[dict]) -> set[str]:
+    found = set()
+    for node in nodes:
+        found.add(node["id"])
+        found |= _ids(node["children"])
+    return found
+
+
+def test_tree_walk_stays_within_user(client, db_engine, make_note):
+    owner = _make_user(db_engine)
+    other = _make_user(db_engine)
+    root = make_note(title="root", user_id=owner)
+    child = make_note(title="child", user_id=owner, parent_id=root["id"])
+    foreign_root = make_note(title="foreign root", user_id=other)
+    stray = make_note(title="stray", user_id=owner, parent_id=foreign_root["id"])
+
+    response = client.get("/notes/tree", params={"user_id": owner})
+    assert response.status_code == 200, response.text
+
+    tree = response.json()
+    assert [node["id"] for node in tree] == [root["id"]]
+    assert _ids(tree) == {root["id"], child["id"]}
+    assert stray["id"] not in _ids(tree)
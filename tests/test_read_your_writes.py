@@ -0,0 +1,36 @@
+"""Read-your-writes pinning of clients to the primary."""
+
+from __future__ import annotations
+
+import uuid
+
+import pytest
+
+from app import dependencies
+from app.dependencies import READ_PRIMARY_COOKIE
+
+
+@pytest.fixture
+def replicated(client, monkeypatch):
+    # The primary doubles as the replica; only the routing decision matters here.
+    primary = dependencies.async_engine or dependencies.engine
+    monkeypatch.setattr(dependencies, "replica_engines", [primary])
+    monkeypatch.setattr(dependencies.settings, "read_your_writes_seconds", 5)
+    client.cookies.clear()
+    yield
+    client.cookies.clear()
+
+
+def test_committed_write_pins_reads_to_the_primary(client, make_note, replicated):
+    make_note(title="pinned")
+    assert float(client.cookies[READ_PRIMARY_COOKIE]) > 0
+
+
+def test_failed_write_and_reads_do_not_pin(client, make_note, replicated):
+    response = client.put(f"/notes/{uuid.uuid4()}", json={"title": "missing"})
+    assert response.status_code == 404
+    assert READ_PRIMARY_COOKIE not in response.cookies
+
+    response = client.get("/notes")
+    assert response.status_code == 200
+    assert READ_PRIMARY_COOKIE not in response.cookies